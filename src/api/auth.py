@@ -17,7 +17,7 @@ from src.api.schemas import (
     OAuthStatusResponse,
     SessionTokenResponse,
 )
-from src.auth.shopify import ShopifyOAuth, verify_hmac
+from src.auth.shopify import ShopifyOAuth
 from src.auth.crypto import encrypt_token, decrypt_token
 from src.auth.jwt import create_session_token, verify_session_token, DEFAULT_EXPIRATION_HOURS
 from src.db.repository import CustomerRepository
@@ -119,7 +119,7 @@ async def shopify_auth_callback(
         raise HTTPException(status_code=500, detail=f"OAuth not configured: {e}")
 
     query_params = dict(request.query_params)
-    if not verify_hmac(query_params, oauth.config.api_secret):
+    if not oauth.verify_callback_hmac(query_params):
         raise HTTPException(status_code=401, detail="Invalid HMAC signature")
 
     customer_repo = CustomerRepository(db)
@@ -146,7 +146,7 @@ async def shopify_auth_callback(
         "installed_at": datetime.now(timezone.utc),
         "uninstalled_at": None,
         "token_validated_at": datetime.now(timezone.utc),
-        "token_invalid": 0,
+        "token_invalid": False,
     })
 
     session_token = create_session_token(str(customer.id), shop)
@@ -3,7 +3,7 @@
 from typing import Annotated
 from uuid import UUID
 
-from fastapi import Depends, Header, HTTPException
+from fastapi import Depends, Header, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from src.api.errors import create_error_response, ErrorCode
@@ -74,7 +74,7 @@ def get_current_customer(
         raise HTTPException(status_code=403, detail="App has been uninstalled for this shop")
 
     # Check if Shopify token has been marked as invalid
-    if getattr(customer, "token_invalid", 0) == 1:
+    if getattr(customer, "token_invalid", False):
         raise create_error_response(
             status_code=401,
             error="Your Shopify connection has expired. Please reconnect your store.",
@@ -137,3 +137,8 @@ def get_easypost_client():
         from src.easypost_client import EasyPostClient
 
         return EasyPostClient()
+
+
+def get_redis(request: Request):
+    """Get the shared Redis client, or None if REDIS_URL is not configured."""
+    return getattr(request.app.state, "redis", None)
@@ -2,7 +2,6 @@
 
 import logging
 import os
-from datetime import datetime, timezone
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
@@ -32,9 +31,9 @@ async def list_orders(
     order_repo = OrderRepository(db)
 
     if status == "unfulfilled":
-        orders = order_repo.list_unfulfilled(customer.id, limit=limit, search=search)
+        orders = order_repo.list_unfulfilled(customer.id, limit=limit, search=search, no_lazy_loads=True)
     else:
-        orders = order_repo.list_by_customer(customer.id, limit=limit, status=status)
+        orders = order_repo.list_by_customer(customer.id, limit=limit, status=status, no_lazy_loads=True)
 
     order_responses = [
         OrderResponse(
@@ -56,18 +55,13 @@ async def list_orders(
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
-    order_id: str,
+    order_id: UUID,
     customer=Depends(get_current_customer),
     db: Session = Depends(get_db),
 ) -> OrderResponse:
     """Get order details."""
-    try:
-        oid = UUID(order_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid order ID format")
-
     order_repo = OrderRepository(db)
-    order = order_repo.get_by_id(oid)
+    order = order_repo.get_by_id(order_id)
 
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
@@ -90,38 +84,33 @@ async def get_order(
 
 @router.post("/{order_id}/fulfill")
 async def fulfill_order(
-    order_id: str,
+    order_id: UUID,
     customer=Depends(get_current_customer),
     db: Session = Depends(get_db),
 ) -> dict:
     """Mark order as fulfilled (shipped)."""
-    try:
-        oid = UUID(order_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid order ID format")
-
     order_repo = OrderRepository(db)
     shipment_repo = ShipmentRepository(db)
 
-    order = order_repo.get_by_id(oid)
+    order = order_repo.get_by_id(order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
     if order.customer_id != customer.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    shipment = shipment_repo.get_by_order_id(oid)
+    shipment = shipment_repo.get_by_order_id(order_id)
     if not shipment:
         raise HTTPException(
             status_code=400,
             detail="Cannot fulfill order without a shipment. Create a shipment first.",
         )
 
-    order_repo.update_status(oid, "fulfilled")
+    order_repo.update_status(order_id, "fulfilled")
 
     return {
         "status": "ok",
-        "order_id": order_id,
+        "order_id": str(order_id),
         "order_status": "fulfilled",
         "tracking_number": shipment.tracking_number,
     }
@@ -197,11 +186,7 @@ async def sync_orders(
             existing_order = order_repo.get_by_shopify_id(customer.id, shopify_order.id)
 
             if existing_order:
-                for key, value in order_data.items():
-                    if key not in ("customer_id", "shopify_order_id"):
-                        setattr(existing_order, key, value)
-                existing_order.updated_at = datetime.now(timezone.utc)
-                db.commit()
+                order_repo.update_fields(existing_order.id, order_data)
                 updated_count += 1
             else:
                 order_repo.create(order_data)
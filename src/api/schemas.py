@@ -2,6 +2,7 @@
 
 import re
 from typing import Annotated
+from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
@@ -162,7 +163,7 @@ class OrderSyncResponse(BaseModel):
 class CreateShipmentRequest(BaseModel):
     """Create shipment request."""
 
-    order_id: str | None = Field(default=None, max_length=100)
+    order_id: UUID | None = None
     rate_id: str = Field(..., min_length=1, max_length=100)
     to_name: str = Field(..., min_length=1, max_length=100)
     to_street: str = Field(..., min_length=1, max_length=200)
@@ -217,7 +218,7 @@ class ShipmentResponse(BaseModel):
 class RateRequest(BaseModel):
     """Get rates request - either order_id OR address fields required."""
 
-    order_id: str | None = Field(default=None, max_length=100)
+    order_id: UUID | None = None
     to_city: str | None = Field(default=None, min_length=1, max_length=100)
     to_state: str | None = Field(default=None, min_length=2, max_length=2)
     to_zip: str | None = Field(default=None, min_length=5, max_length=10)
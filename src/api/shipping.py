@@ -3,7 +3,7 @@
 import logging
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from src.api.deps import get_db, get_current_customer, get_easypost_client
@@ -36,6 +36,15 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["shipping"])
 
+# EasyPost carrier name -> Shopify tracking company name
+SHOPIFY_TRACKING_COMPANIES = {
+    "USPS": "USPS",
+    "UPS": "UPS",
+    "FedEx": "FedEx",
+    "DHL": "DHL Express",
+    "DHL Express": "DHL Express",
+}
+
 
 @router.post("/rates", response_model=RatesResponse)
 async def get_rates(
@@ -48,21 +57,10 @@ async def get_rates(
     client = get_easypost_client()
 
     if request.order_id:
-        try:
-            oid = UUID(request.order_id)
-        except ValueError:
-            raise create_error_response(
-                status_code=400,
-                error="Invalid order ID format",
-                code=ErrorCode.VALIDATION_ERROR,
-                customer_id=customer_id_str,
-                endpoint="/api/rates",
-            )
-
         order_repo = OrderRepository(db)
-        order = order_repo.get_by_id(oid)
+        order = order_repo.get_for_customer(request.order_id, customer.id)
 
-        if not order or order.customer_id != customer.id:
+        if not order:
             raise create_error_response(
                 status_code=404,
                 error="Order not found",
@@ -127,9 +125,10 @@ async def get_rates(
             exc=e,
         )
 
-    return RatesResponse(
+    # Rates come from our own client, so skip per-field validation.
+    return RatesResponse.model_construct(
         rates=[
-            RateResponse(
+            RateResponse.model_construct(
                 rate_id=r.rate_id,
                 carrier=r.carrier,
                 service=r.service,
@@ -206,6 +205,7 @@ async def validate_address(
 @router.post("/shipments", response_model=ShipmentResponse)
 async def create_shipment(
     request: CreateShipmentRequest,
+    background_tasks: BackgroundTasks,
     customer=Depends(get_current_customer),
     db: Session = Depends(get_db),
 ) -> ShipmentResponse:
@@ -216,21 +216,10 @@ async def create_shipment(
     shipment_repo = ShipmentRepository(db)
     customer_repo = CustomerRepository(db)
 
-    order_id = None
-    if request.order_id:
-        try:
-            order_id = UUID(request.order_id)
-        except ValueError:
-            raise create_error_response(
-                status_code=400,
-                error="Invalid order ID format",
-                code=ErrorCode.VALIDATION_ERROR,
-                customer_id=customer_id_str,
-                endpoint="/api/shipments",
-            )
-
-        order = order_repo.get_by_id(order_id)
-        if not order or order.customer_id != customer.id:
+    order_id = request.order_id
+    if order_id:
+        order = order_repo.get_for_customer(order_id, customer.id)
+        if not order:
             raise create_error_response(
                 status_code=404,
                 error="Order not found",
@@ -239,7 +228,9 @@ async def create_shipment(
                 endpoint="/api/shipments",
             )
 
-    if customer.labels_this_month >= customer.labels_limit:
+    # Check the limit and take a label in one UPDATE so concurrent requests
+    # can't both slip under it.
+    if customer_repo.try_consume_label(customer.id) is None:
         raise create_error_response(
             status_code=403,
             error=f"Label limit reached ({customer.labels_limit}/month). Upgrade your plan.",
@@ -265,6 +256,7 @@ async def create_shipment(
     try:
         shipment = client.create_shipment(to_address, parcel, request.rate_id)
     except ShipmentError as e:
+        customer_repo.release_label(customer.id)
         raise create_error_response(
             status_code=502,
             error=e.message,
@@ -274,6 +266,7 @@ async def create_shipment(
             exc=e,
         )
     except Exception as e:
+        customer_repo.release_label(customer.id)
         raise create_error_response(
             status_code=500,
             error="Unable to create shipment. Please try again.",
@@ -296,20 +289,23 @@ async def create_shipment(
     })
 
     if order_id:
-        order_repo.update_status(order_id, "shipped")
+        order = order_repo.update_status(order_id, "shipped")
 
-        order = order_repo.get_by_id(order_id)
+        # Shopify write-back runs after the response is sent; its result is
+        # only logged, so it shouldn't hold up label purchase.
         if order and order.shopify_order_id and customer.shopify_access_token:
-            await _create_shopify_fulfillment(
-                customer=customer,
+            background_tasks.add_task(
+                _create_shopify_fulfillment,
+                # Plain values: the task runs after the request's session is closed
+                customer_id=customer.id,
+                shop_domain=customer.shop_domain,
+                encrypted_access_token=customer.shopify_access_token,
                 shopify_order_id=order.shopify_order_id,
                 tracking_number=shipment.tracking_number,
                 carrier=shipment.carrier,
             )
 
-    customer_repo.increment_label_count(customer.id)
-
-    return ShipmentResponse(
+    return ShipmentResponse.model_construct(
         id=str(db_shipment.id),
         order_id=str(order_id) if order_id else None,
         tracking_number=db_shipment.tracking_number,
@@ -325,18 +321,13 @@ async def create_shipment(
 
 @router.get("/shipments/{shipment_id}", response_model=ShipmentResponse)
 async def get_shipment(
-    shipment_id: str,
+    shipment_id: UUID,
     customer=Depends(get_current_customer),
     db: Session = Depends(get_db),
 ) -> ShipmentResponse:
     """Get shipment details."""
-    try:
-        sid = UUID(shipment_id)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid shipment ID format")
-
     shipment_repo = ShipmentRepository(db)
-    shipment = shipment_repo.get_by_id(sid)
+    shipment = shipment_repo.get_by_id(shipment_id)
 
     if not shipment:
         raise HTTPException(status_code=404, detail="Shipment not found")
@@ -344,7 +335,7 @@ async def get_shipment(
     if shipment.customer_id != customer.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    return ShipmentResponse(
+    return ShipmentResponse.model_construct(
         id=str(shipment.id),
         order_id=str(shipment.order_id) if shipment.order_id else None,
         tracking_number=shipment.tracking_number,
@@ -360,26 +351,15 @@ async def get_shipment(
 
 @router.get("/shipments/{shipment_id}/tracking", response_model=TrackingResponse)
 async def get_tracking(
-    shipment_id: str,
+    shipment_id: UUID,
     customer=Depends(get_current_customer),
     db: Session = Depends(get_db),
 ) -> TrackingResponse:
     """Get tracking events for a shipment."""
     customer_id_str = str(customer.id)
 
-    try:
-        sid = UUID(shipment_id)
-    except ValueError:
-        raise create_error_response(
-            status_code=400,
-            error="Invalid shipment ID format",
-            code=ErrorCode.VALIDATION_ERROR,
-            customer_id=customer_id_str,
-            endpoint="/api/shipments/{id}/tracking",
-        )
-
     shipment_repo = ShipmentRepository(db)
-    shipment = shipment_repo.get_by_id(sid)
+    shipment = shipment_repo.get_by_id(shipment_id)
 
     if not shipment:
         raise create_error_response(
@@ -429,7 +409,7 @@ async def get_tracking(
         elif location is None:
             location = None
 
-        events.append(TrackingEventResponse(
+        events.append(TrackingEventResponse.model_construct(
             status=event.get("status", ""),
             description=event.get("message", event.get("description", "")),
             location=location,
@@ -446,32 +426,27 @@ async def get_tracking(
 
 
 async def _create_shopify_fulfillment(
-    customer,
+    customer_id: UUID,
+    shop_domain: str,
+    encrypted_access_token: str | None,
     shopify_order_id: str,
     tracking_number: str,
     carrier: str,
 ) -> bool:
     """Create a fulfillment in Shopify for a shipped order."""
-    if not customer.shopify_access_token:
+    if not encrypted_access_token:
         logger.debug("Skipping Shopify fulfillment: no access token")
         return False
 
-    access_token = decrypt_token(customer.shopify_access_token)
+    access_token = decrypt_token(encrypted_access_token)
     if not access_token:
-        logger.warning("Failed to decrypt Shopify token for customer %s", customer.id)
+        logger.warning("Failed to decrypt Shopify token for customer %s", customer_id)
         return False
 
-    carrier_map = {
-        "USPS": "USPS",
-        "UPS": "UPS",
-        "FedEx": "FedEx",
-        "DHL": "DHL Express",
-        "DHL Express": "DHL Express",
-    }
-    tracking_company = carrier_map.get(carrier, carrier)
+    tracking_company = SHOPIFY_TRACKING_COMPANIES.get(carrier, carrier)
 
     try:
-        shopify_client = ShopifyAdminClient(customer.shop_domain, access_token)
+        shopify_client = ShopifyAdminClient(shop_domain, access_token)
         fulfillment = await shopify_client.create_fulfillment(
             order_id=shopify_order_id,
             tracking_number=tracking_number,
@@ -16,6 +16,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/webhooks/shopify", tags=["webhooks"])
 
+# Webhook signing key, read once and pre-encoded for HMAC
+WEBHOOK_SECRET = os.getenv("SHOPIFY_API_SECRET", "").encode()
+
 
 @router.post("/uninstall")
 async def shopify_uninstall_webhook(
@@ -23,12 +26,10 @@ async def shopify_uninstall_webhook(
     db: Session = Depends(get_db),
 ) -> dict:
     """Handle Shopify app/uninstalled webhook."""
-    webhook_secret = os.getenv("SHOPIFY_API_SECRET", "")
-
     body = await request.body()
     hmac_header = request.headers.get("X-Shopify-Hmac-Sha256", "")
 
-    if not verify_webhook_hmac(body, hmac_header, webhook_secret):
+    if not verify_webhook_hmac(body, hmac_header, WEBHOOK_SECRET):
         raise HTTPException(status_code=401, detail="Invalid webhook signature")
 
     try:
@@ -60,12 +61,10 @@ async def shopify_orders_webhook(
     db: Session = Depends(get_db),
 ) -> dict:
     """Handle Shopify order webhooks (orders/create, orders/updated, orders/cancelled)."""
-    webhook_secret = os.getenv("SHOPIFY_API_SECRET", "")
-
     body = await request.body()
     hmac_header = request.headers.get("X-Shopify-Hmac-Sha256", "")
 
-    if not verify_webhook_hmac(body, hmac_header, webhook_secret):
+    if not verify_webhook_hmac(body, hmac_header, WEBHOOK_SECRET):
         logger.warning("Invalid webhook signature for orders webhook")
         raise HTTPException(status_code=401, detail="Invalid webhook signature")
 
@@ -97,18 +96,8 @@ async def shopify_orders_webhook(
             logger.info("Order %s cancelled for shop %s", shopify_order_id, shop_domain)
     else:
         order_data = parse_shopify_order_webhook(data, customer.id)
-        existing_order = order_repo.get_by_shopify_id(customer.id, shopify_order_id)
-
-        if existing_order:
-            for key, value in order_data.items():
-                if key not in ("customer_id", "shopify_order_id"):
-                    setattr(existing_order, key, value)
-            existing_order.updated_at = datetime.now(timezone.utc)
-            db.commit()
-            logger.info("Order %s updated for shop %s", shopify_order_id, shop_domain)
-        else:
-            order_repo.create(order_data)
-            logger.info("Order %s created for shop %s", shopify_order_id, shop_domain)
+        order_repo.upsert_by_shopify_id(order_data)
+        logger.info("Order %s upserted for shop %s (%s)", shopify_order_id, shop_domain, topic)
 
     return {"status": "ok"}
 
@@ -27,8 +27,18 @@ class SessionPayload:
 
     customer_id: str
     shop_domain: str
-    exp: datetime
-    iat: datetime
+    exp: int  # Expiry, epoch seconds
+    iat: int  # Issued at, epoch seconds
+
+    @property
+    def expires_at(self) -> datetime:
+        """Expiry as a timezone-aware datetime."""
+        return datetime.fromtimestamp(self.exp, tz=timezone.utc)
+
+    @property
+    def issued_at(self) -> datetime:
+        """Issue time as a timezone-aware datetime."""
+        return datetime.fromtimestamp(self.iat, tz=timezone.utc)
 
 
 def create_session_token(
@@ -46,12 +56,12 @@ def create_session_token(
     Returns:
         Encoded JWT token string
     """
-    now = datetime.now(timezone.utc)
+    now = int(datetime.now(timezone.utc).timestamp())
     payload = {
         "sub": str(customer_id),
         "shop": shop_domain,
         "iat": now,
-        "exp": now + timedelta(hours=expiration_hours),
+        "exp": now + int(timedelta(hours=expiration_hours).total_seconds()),
     }
 
     return jwt.encode(payload, _get_secret_key(), algorithm=ALGORITHM)
@@ -76,8 +86,8 @@ def verify_session_token(token: str) -> Optional[SessionPayload]:
         return SessionPayload(
             customer_id=payload["sub"],
             shop_domain=payload["shop"],
-            exp=datetime.fromtimestamp(payload["exp"], tz=timezone.utc),
-            iat=datetime.fromtimestamp(payload["iat"], tz=timezone.utc),
+            exp=payload["exp"],
+            iat=payload["iat"],
         )
     except InvalidTokenError:
         return None
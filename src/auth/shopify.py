@@ -1,19 +1,28 @@
 """Shopify OAuth 2.0 implementation and Admin API client."""
 
+import asyncio
 import os
-import re
 import hmac
 import hashlib
-import base64
+import binascii
 import secrets
+import string
 import logging
-from urllib.parse import urlencode, parse_qs
+import time
+from urllib.parse import urlencode, parse_qs, quote_plus
 from dataclasses import dataclass, field
-from typing import Optional
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+from weakref import WeakKeyDictionary
 from datetime import datetime
 
 import httpx
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # optional "speedups" extra
+    from json import loads as json_loads
+
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +31,44 @@ logger = logging.getLogger(__name__)
 SHOPIFY_AUTH_URL = "https://{shop}/admin/oauth/authorize"
 SHOPIFY_TOKEN_URL = "https://{shop}/admin/oauth/access_token"
 
-# Regex for valid Shopify shop domains
-SHOP_DOMAIN_PATTERN = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9\-]*\.myshopify\.com$")
+# Valid shop domains are <name>.myshopify.com, where the name is ASCII
+# letters, digits and hyphens and doesn't start with a hyphen. The name is
+# a single DNS label, so at most 63 characters
+SHOP_DOMAIN_SUFFIX = ".myshopify.com"
+SHOP_NAME_CHARS = (string.ascii_letters + string.digits + "-").encode()
+MAX_SHOP_NAME_LENGTH = 63
+MAX_SHOP_DOMAIN_LENGTH = MAX_SHOP_NAME_LENGTH + len(SHOP_DOMAIN_SUFFIX)
+
+# Base64 length covering a MAX_SHOP_NAME_LENGTH name + ".myshopify.com/" (78 bytes)
+HOST_PREFIX_B64_CHARS = 104
+
+# Shared HTTP client so Shopify calls reuse pooled keep-alive connections
+# instead of paying DNS + TCP + TLS setup on every request. Connections
+# belong to the event loop that opened them, so there is one per loop.
+_http_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared Shopify HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _http_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+        )
+        _http_clients[loop] = client
+    return client
+
 
+async def close_http_client() -> None:
+    """Close the running event loop's Shopify HTTP client, if one was created."""
+    client = _http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
 
-@dataclass
+
+@dataclass(slots=True)
 class ShopifyConfig:
     """Shopify OAuth configuration."""
 
@@ -56,7 +98,7 @@ class ShopifyConfig:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class OAuthTokenResponse:
     """Response from Shopify token exchange."""
 
@@ -77,6 +119,13 @@ class ShopifyOAuth:
             config: Shopify configuration, or None to load from env
         """
         self.config = config or ShopifyConfig.from_env()
+        self._secret_bytes = self.config.api_secret.encode()
+        # Everything but the state in the authorize query is fixed per config
+        self._auth_query = urlencode({
+            "client_id": self.config.api_key,
+            "scope": self.config.scopes,
+            "redirect_uri": f"{self.config.app_url}/auth/shopify/callback",
+        })
 
     @staticmethod
     def validate_shop_domain(shop: str) -> bool:
@@ -88,9 +137,14 @@ class ShopifyOAuth:
         Returns:
             True if valid, False otherwise
         """
-        if not shop:
+        # Length first: rejects oversized input before touching its contents
+        if not shop or len(shop) > MAX_SHOP_DOMAIN_LENGTH or not shop.endswith(SHOP_DOMAIN_SUFFIX):
             return False
-        return bool(SHOP_DOMAIN_PATTERN.match(shop))
+        name = shop[:-len(SHOP_DOMAIN_SUFFIX)]
+        if not name or name[0] == "-" or not name.isascii():
+            return False
+        # Deleting every allowed byte leaves nothing for a valid name
+        return not name.encode().translate(None, SHOP_NAME_CHARS)
 
     @staticmethod
     def generate_nonce() -> str:
@@ -114,16 +168,7 @@ class ShopifyOAuth:
         if not self.validate_shop_domain(shop):
             raise ValueError(f"Invalid shop domain: {shop}")
 
-        redirect_uri = f"{self.config.app_url}/auth/shopify/callback"
-
-        params = {
-            "client_id": self.config.api_key,
-            "scope": self.config.scopes,
-            "redirect_uri": redirect_uri,
-            "state": nonce,
-        }
-
-        return SHOPIFY_AUTH_URL.format(shop=shop) + "?" + urlencode(params)
+        return f"{SHOPIFY_AUTH_URL.format(shop=shop)}?{self._auth_query}&state={quote_plus(nonce)}"
 
     async def exchange_code_for_token(
         self, shop: str, code: str
@@ -148,10 +193,10 @@ class ShopifyOAuth:
             "code": code,
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client()
+        response = await client.post(url, json=payload)
+        response.raise_for_status()
+        data = json_loads(response.content)
 
         return OAuthTokenResponse(
             access_token=data["access_token"],
@@ -170,10 +215,23 @@ class ShopifyOAuth:
         Returns:
             True if HMAC is valid, False otherwise
         """
-        return verify_hmac(query_params, self.config.api_secret)
+        return verify_hmac(query_params, self._secret_bytes)
+
+
+@lru_cache(maxsize=8)
+def _hmac_template(key: bytes) -> "hmac.HMAC":
+    """HMAC-SHA256 object with the key schedule already applied."""
+    return hmac.new(key, digestmod="sha256")
+
 
+def _sha256_hmac(key: bytes, message: bytes) -> bytes:
+    """HMAC-SHA256 digest, reusing the primed state for this key."""
+    mac = _hmac_template(key).copy()
+    mac.update(message)
+    return mac.digest()
 
-def verify_hmac(query_params: dict, secret: str) -> bool:
+
+def verify_hmac(query_params: dict, secret: str | bytes) -> bool:
     """Verify HMAC signature on Shopify request query parameters.
 
     Shopify signs requests with HMAC-SHA256 of the query string
@@ -181,7 +239,7 @@ def verify_hmac(query_params: dict, secret: str) -> bool:
 
     Args:
         query_params: Dictionary of query parameters
-        secret: Shopify API secret
+        secret: Shopify API secret, as str or pre-encoded bytes
 
     Returns:
         True if HMAC is valid, False otherwise
@@ -189,32 +247,30 @@ def verify_hmac(query_params: dict, secret: str) -> bool:
     if "hmac" not in query_params:
         return False
 
-    provided_hmac = query_params["hmac"]
-
-    # Build message from sorted params (excluding hmac)
-    params = []
-    for key, value in sorted(query_params.items()):
-        if key == "hmac":
-            continue
-        # Handle list values (from parse_qs)
-        if isinstance(value, list):
-            value = value[0]
-        params.append(f"{key}={value}")
+    # Shopify sends the signature as hex; a value that isn't hex can't match
+    try:
+        provided_hmac = bytes.fromhex(query_params["hmac"])
+    except (TypeError, ValueError):
+        return False
 
-    message = "&".join(params)
+    # Build message from sorted params (excluding hmac). Request query
+    # params are flat strings; list values only come from parse_qs, so
+    # an exact type check (no subclass walk) is enough.
+    message = "&".join([
+        f"{key}={value[0] if type(value) is list else value}"
+        for key, value in sorted(query_params.items())
+        if key != "hmac"
+    ]).encode()
 
     # Compute expected HMAC
-    computed = hmac.new(
-        secret.encode(),
-        message.encode(),
-        hashlib.sha256
-    ).hexdigest()
+    key = secret if isinstance(secret, bytes) else secret.encode()
+    computed = _sha256_hmac(key, message)
 
-    # Timing-safe comparison
+    # Timing-safe comparison of the raw 32-byte digests
     return hmac.compare_digest(computed, provided_hmac)
 
 
-def verify_webhook_hmac(body: bytes, hmac_header: str, secret: str) -> bool:
+def verify_webhook_hmac(body: bytes, hmac_header: str, secret: str | bytes) -> bool:
     """Verify HMAC signature on Shopify webhook.
 
     Shopify signs webhook bodies with HMAC-SHA256.
@@ -222,7 +278,7 @@ def verify_webhook_hmac(body: bytes, hmac_header: str, secret: str) -> bool:
     Args:
         body: Raw request body bytes
         hmac_header: X-Shopify-Hmac-Sha256 header value
-        secret: Shopify API secret (or webhook secret)
+        secret: Shopify API secret (or webhook secret), as str or pre-encoded bytes
 
     Returns:
         True if HMAC is valid, False otherwise
@@ -230,15 +286,15 @@ def verify_webhook_hmac(body: bytes, hmac_header: str, secret: str) -> bool:
     if not hmac_header:
         return False
 
-    computed = base64.b64encode(
-        hmac.new(
-            secret.encode(),
-            body,
-            hashlib.sha256
-        ).digest()
-    ).decode()
+    # Decode the header once and compare raw digests; malformed or
+    # non-ASCII values are rejected before hashing the body
+    try:
+        provided = binascii.a2b_base64(hmac_header, strict_mode=True)
+    except ValueError:
+        return False
 
-    return hmac.compare_digest(computed, hmac_header)
+    key = secret if isinstance(secret, bytes) else secret.encode()
+    return hmac.compare_digest(_sha256_hmac(key, body), provided)
 
 
 def parse_shop_from_host(host: str) -> Optional[str]:
@@ -252,15 +308,30 @@ def parse_shop_from_host(host: str) -> Optional[str]:
     Returns:
         Decoded shop domain, or None if invalid
     """
+    # Host format is "shop-name.myshopify.com/admin"; any valid shop fits
+    # in the first HOST_PREFIX_B64_CHARS, so decode only those
+    prefix = host[:HOST_PREFIX_B64_CHARS]
+    # Shopify may omit base64 padding; restore it rather than fail the decode
+    pad = -len(prefix) % 4
+    if pad:
+        prefix += "=" * pad
     try:
-        decoded = base64.b64decode(host).decode()
-        # Host format is "shop-name.myshopify.com/admin"
-        shop = decoded.split("/")[0]
-        if ShopifyOAuth.validate_shop_domain(shop):
-            return shop
-        return None
-    except Exception:
+        shop = binascii.a2b_base64(prefix).partition(b"/")[0].decode()
+    except (TypeError, ValueError):
         return None
+    if ShopifyOAuth.validate_shop_domain(shop):
+        return shop
+    return None
+
+
+# How long a definite token verdict (valid / revoked) is reused
+TOKEN_VALIDATION_TTL_SECONDS = 5 * 60
+TOKEN_VALIDATION_CACHE_SIZE = 1024
+
+# (shop, sha256(token)) -> (expires_at, is_valid)
+_token_validation_cache: dict[tuple[str, bytes], tuple[float, bool]] = {}
+# In-flight checks, so concurrent callers share one Shopify request
+_token_validation_pending: dict[tuple[str, bytes], asyncio.Task] = {}
 
 
 async def validate_access_token(shop: str, access_token: str) -> bool:
@@ -272,6 +343,8 @@ async def validate_access_token(shop: str, access_token: str) -> bool:
     - Shopify rotates tokens (rare)
 
     This function makes a lightweight API call to verify the token works.
+    Definite answers are cached for TOKEN_VALIDATION_TTL_SECONDS, and
+    concurrent checks of the same token share one API call.
 
     Args:
         shop: Shopify store domain (e.g., store.myshopify.com)
@@ -287,43 +360,76 @@ async def validate_access_token(shop: str, access_token: str) -> bool:
     if not ShopifyOAuth.validate_shop_domain(shop):
         return False
 
-    # Use the shop.json endpoint as a lightweight validation call
-    url = f"https://{shop}/admin/api/2024-01/shop.json"
+    key = (shop, hashlib.sha256(access_token.encode()).digest())
+    cached = _token_validation_cache.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    task = _token_validation_pending.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_check_access_token(shop, access_token))
+        _token_validation_pending[key] = task
+        task.add_done_callback(lambda _: _token_validation_pending.pop(key, None))
+    is_valid = await asyncio.shield(task)
+
+    if is_valid is None:
+        # Can't determine validity - assume valid to avoid false negatives
+        return True
+
+    if key not in _token_validation_cache and len(_token_validation_cache) >= TOKEN_VALIDATION_CACHE_SIZE:
+        # Drop the oldest entry (dicts keep insertion order)
+        del _token_validation_cache[next(iter(_token_validation_cache))]
+    _token_validation_cache[key] = (time.monotonic() + TOKEN_VALIDATION_TTL_SECONDS, is_valid)
+    return is_valid
+
+
+async def validate_access_tokens_bulk(pairs: list[tuple[str, str]]) -> list[bool]:
+    """Validate many (shop, access_token) pairs concurrently.
+
+    Requests share the pooled client, so concurrency is bounded by its
+    connection limits. Results are in input order; an unexpected error
+    counts as valid, like any other undetermined check.
+    """
+    results = await asyncio.gather(
+        *[validate_access_token(shop, token) for shop, token in pairs],
+        return_exceptions=True,
+    )
+    return [True if isinstance(result, Exception) else result for result in results]
+
+
+async def _check_access_token(shop: str, access_token: str) -> bool | None:
+    """Call Shopify to check a token. Returns None if the result is unknown."""
+    # HEAD on shop.json answers with the status alone, no body to transfer
+    url = f"https://{shop}/admin/api/{SHOPIFY_API_VERSION}/shop.json"
+    headers = {"X-Shopify-Access-Token": access_token}
 
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        client = get_http_client()
+        response = await client.head(url, headers=headers, timeout=10.0)
+        if response.status_code == 405:
+            # HEAD not allowed - ask for the smallest possible body instead
             response = await client.get(
-                url,
-                headers={
-                    "X-Shopify-Access-Token": access_token,
-                    "Content-Type": "application/json",
-                },
+                url, params={"fields": "id"}, headers=headers, timeout=10.0
             )
-
-            # 200 = valid token
-            # 401/403 = invalid or revoked token
-            # Other errors = network issues, treat as unknown
-            if response.status_code == 200:
-                return True
-            elif response.status_code in (401, 403):
-                return False
-            else:
-                # For other errors (5xx, network issues), we can't determine
-                # validity - return True to avoid false negatives
-                return True
-    except httpx.TimeoutException:
-        # Timeout - can't determine, assume valid to avoid false negatives
-        return True
     except Exception:
-        # Network or other error - can't determine, assume valid
+        # Timeout, network or other error - can't determine
+        return None
+
+    # 200 = valid token
+    # 401/403 = invalid or revoked token
+    # Other errors (5xx) = can't determine
+    if response.status_code == 200:
         return True
+    if response.status_code in (401, 403):
+        return False
+    return None
 
 
 # Shopify Admin API version
 SHOPIFY_API_VERSION = "2024-01"
 
 
-@dataclass
+@dataclass(slots=True)
 class ShopifyOrder:
     """Parsed Shopify order data."""
 
@@ -341,7 +447,7 @@ class ShopifyOrder:
     cancelled_at: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ShopifyFulfillment:
     """Parsed Shopify fulfillment data."""
 
@@ -353,6 +459,20 @@ class ShopifyFulfillment:
     tracking_company: str | None
 
 
+def _parse_line_item(item: dict) -> dict:
+    """Extract the fields we keep from a Shopify line item."""
+    get = item.get
+    return {
+        "id": str(get("id")),
+        "title": get("title"),
+        "quantity": get("quantity", 1),
+        "price": get("price"),
+        "sku": get("sku"),
+        "grams": get("grams", 0),
+        "variant_title": get("variant_title"),
+    }
+
+
 class ShopifyAdminClient:
     """Shopify Admin API client for order and fulfillment operations."""
 
@@ -366,11 +486,13 @@ class ShopifyAdminClient:
         self.shop = shop
         self.access_token = access_token
         self.base_url = f"https://{shop}/admin/api/{SHOPIFY_API_VERSION}"
-
-    def _headers(self) -> dict[str, str]:
-        """Get headers for API requests."""
-        return {
-            "X-Shopify-Access-Token": self.access_token,
+        self._orders_url = f"{self.base_url}/orders.json"
+        self._fulfillments_url = f"{self.base_url}/fulfillments.json"
+        self._webhooks_url = f"{self.base_url}/webhooks.json"
+        # Built once; the HTTP client is shared across shops, so these are
+        # passed per request rather than set as client defaults
+        self._headers = {
+            "X-Shopify-Access-Token": access_token,
             "Content-Type": "application/json",
         }
 
@@ -392,33 +514,79 @@ class ShopifyAdminClient:
         Returns:
             List of ShopifyOrder objects
         """
-        params = {
-            "status": "any",  # Get all orders regardless of financial status
-            "limit": min(limit, 250),
-        }
-
-        if status == "unfulfilled":
-            params["fulfillment_status"] = "unfulfilled"
-        elif status == "fulfilled":
-            params["fulfillment_status"] = "shipped"
-
+        params = self._orders_params(status, limit)
         if since_id:
             params["since_id"] = since_id
         if created_at_min:
             params["created_at_min"] = created_at_min.isoformat()
 
-        url = f"{self.base_url}/orders.json"
+        url = self._orders_url
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=self._headers(), params=params)
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client()
+        response = await client.get(url, headers=self._headers, params=params)
+        response.raise_for_status()
+        # Order pages can be hundreds of KB; decode with orjson when available
+        data = json_loads(response.content)
 
         orders = []
         for o in data.get("orders", []):
             orders.append(self._parse_order(o))
         return orders
 
+    async def iter_orders(
+        self,
+        status: str = "unfulfilled",
+        page_size: int = 250,
+    ) -> AsyncIterator[ShopifyOrder]:
+        """Iterate over all matching orders, following cursor pagination.
+
+        The next page (from the response's Link header) is requested
+        while the current page is being parsed and consumed.
+
+        Args:
+            status: Fulfillment status filter ("unfulfilled", "any", "fulfilled")
+            page_size: Orders per request (max 250)
+
+        Yields:
+            ShopifyOrder objects
+        """
+        client = get_http_client()
+        pending = asyncio.ensure_future(
+            client.get(self._orders_url, headers=self._headers, params=self._orders_params(status, page_size))
+        )
+        try:
+            while pending is not None:
+                response = await pending
+                pending = None
+                response.raise_for_status()
+
+                next_link = response.links.get("next")
+                if next_link:
+                    pending = asyncio.ensure_future(
+                        client.get(next_link["url"], headers=self._headers)
+                    )
+
+                for o in json_loads(response.content).get("orders", []):
+                    yield self._parse_order(o)
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    @staticmethod
+    def _orders_params(status: str, limit: int) -> dict:
+        """Query params for the orders endpoint."""
+        params = {
+            "status": "any",  # Get all orders regardless of financial status
+            "limit": min(limit, 250),
+        }
+
+        if status == "unfulfilled":
+            params["fulfillment_status"] = "unfulfilled"
+        elif status == "fulfilled":
+            params["fulfillment_status"] = "shipped"
+
+        return params
+
     async def get_order(self, order_id: str) -> ShopifyOrder | None:
         """Fetch a single order by ID.
 
@@ -430,31 +598,22 @@ class ShopifyAdminClient:
         """
         url = f"{self.base_url}/orders/{order_id}.json"
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=self._headers())
-            if response.status_code == 404:
-                return None
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client()
+        response = await client.get(url, headers=self._headers)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        data = json_loads(response.content)
 
         return self._parse_order(data.get("order", {}))
 
     def _parse_order(self, data: dict) -> ShopifyOrder:
         """Parse Shopify order JSON into ShopifyOrder object."""
-        # Calculate total weight from line items
-        total_weight = 0
-        line_items = []
-        for item in data.get("line_items", []):
-            total_weight += item.get("grams", 0) * item.get("quantity", 1)
-            line_items.append({
-                "id": str(item.get("id")),
-                "title": item.get("title"),
-                "quantity": item.get("quantity", 1),
-                "price": item.get("price"),
-                "sku": item.get("sku"),
-                "grams": item.get("grams", 0),
-                "variant_title": item.get("variant_title"),
-            })
+        # Line items stay plain dicts: they're stored as JSON on the order
+        line_items = [_parse_line_item(item) for item in data.get("line_items", [])]
+
+        # Total weight from the already-extracted values
+        total_weight = sum(item["grams"] * item["quantity"] for item in line_items)
 
         # Parse shipping address
         shipping_address = None
@@ -541,7 +700,7 @@ class ShopifyAdminClient:
                 })
 
         # Create fulfillment using the new fulfillment API
-        url = f"{self.base_url}/fulfillments.json"
+        url = self._fulfillments_url
         payload = {
             "fulfillment": {
                 "line_items_by_fulfillment_order": [
@@ -561,10 +720,10 @@ class ShopifyAdminClient:
         if tracking_url:
             payload["fulfillment"]["tracking_info"]["url"] = tracking_url
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, headers=self._headers(), json=payload)
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client()
+        response = await client.post(url, headers=self._headers, json=payload)
+        response.raise_for_status()
+        data = json_loads(response.content)
 
         fulfillment = data.get("fulfillment", {})
         return ShopifyFulfillment(
@@ -587,10 +746,10 @@ class ShopifyAdminClient:
         """
         url = f"{self.base_url}/orders/{order_id}/fulfillment_orders.json"
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=self._headers())
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client()
+        response = await client.get(url, headers=self._headers)
+        response.raise_for_status()
+        data = json_loads(response.content)
 
         return data.get("fulfillment_orders", [])
 
@@ -610,33 +769,46 @@ class ShopifyAdminClient:
         ]
 
         created = []
-        url = f"{self.base_url}/webhooks.json"
-
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for webhook in webhooks_to_register:
-                payload = {
-                    "webhook": {
-                        "topic": webhook["topic"],
-                        "address": webhook["address"],
-                        "format": "json",
-                    }
-                }
-                try:
-                    response = await client.post(url, headers=self._headers(), json=payload)
-                    if response.status_code == 201:
-                        created.append(response.json().get("webhook", {}))
-                        logger.info("Registered webhook: %s", webhook["topic"])
-                    elif response.status_code == 422:
-                        # Webhook already exists
-                        logger.info("Webhook already exists: %s", webhook["topic"])
-                    else:
-                        logger.warning(
-                            "Failed to register webhook %s: %s",
-                            webhook["topic"],
-                            response.text,
-                        )
-                except Exception as e:
-                    logger.error("Error registering webhook %s: %s", webhook["topic"], e)
+        url = self._webhooks_url
+
+        # Register all topics concurrently over the shared connection pool
+        client = get_http_client()
+        responses = await asyncio.gather(
+            *(
+                client.post(
+                    url,
+                    headers=self._headers,
+                    json={
+                        "webhook": {
+                            "topic": webhook["topic"],
+                            "address": webhook["address"],
+                            "format": "json",
+                        }
+                    },
+                )
+                for webhook in webhooks_to_register
+            ),
+            return_exceptions=True,
+        )
+
+        for webhook, response in zip(webhooks_to_register, responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                if response.status_code == 201:
+                    created.append(json_loads(response.content).get("webhook", {}))
+                    logger.info("Registered webhook: %s", webhook["topic"])
+                elif response.status_code == 422:
+                    # Webhook already exists
+                    logger.info("Webhook already exists: %s", webhook["topic"])
+                else:
+                    logger.warning(
+                        "Failed to register webhook %s: %s",
+                        webhook["topic"],
+                        response.text,
+                    )
+            except Exception as e:
+                logger.error("Error registering webhook %s: %s", webhook["topic"], e)
 
         return created
 
@@ -646,11 +818,11 @@ class ShopifyAdminClient:
         Returns:
             List of webhook objects
         """
-        url = f"{self.base_url}/webhooks.json"
+        url = self._webhooks_url
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=self._headers())
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client()
+        response = await client.get(url, headers=self._headers)
+        response.raise_for_status()
+        data = json_loads(response.content)
 
         return data.get("webhooks", [])
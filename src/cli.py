@@ -1,42 +1,119 @@
 """CLI interface for the shipping agent."""
 
+import json
 import os
 import sys
+from pathlib import Path
 
 from dotenv import load_dotenv
 from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
+from sqlalchemy.orm import Session
 
 from src.agent import ShippingAgent
 from src.agent.agent import is_mock_mode
 
 
-def setup_database():
-    """Set up database and return session with demo customer context."""
-    from src.db.migrations import run_migrations
-    from src.db.database import get_db_session
-    from src.db.seed import seed_demo_data, get_demo_customer, has_demo_data
+# Records which SQLite file was set up, against which migration scripts and
+# at which revision, so later starts can skip migrations and the seed check.
+# File identity (not mtime) is used because every write, and every WAL
+# checkpoint, touches the mtime.
+STARTUP_STAMP_PATH = Path.home() / ".cache" / "shipping_agent" / "db.stamp"
+MIGRATIONS_DIR = Path(__file__).parent / "db" / "alembic" / "versions"
+
+
+def _startup_fingerprint() -> dict | None:
+    """Describe the database file and migration scripts, or None if not a SQLite file."""
+    from src.db.database import get_database_url
+
+    url = get_database_url()
+    if not url.startswith("sqlite:///") or ":memory:" in url or "mode=memory" in url:
+        return None
+
+    db_path = os.path.abspath(url.removeprefix("sqlite:///").split("?", 1)[0])
+    try:
+        inode = os.stat(db_path).st_ino
+        migrations = sorted(p.name for p in MIGRATIONS_DIR.glob("*.py"))
+    except OSError:
+        return None
+    return {"db": db_path, "inode": inode, "migrations": migrations}
+
+
+def _stamp_matches(fingerprint: dict | None, stamp: dict | None) -> bool:
+    """Whether the stamped file is still the database, at the stamped revision."""
+    if fingerprint is None or not stamp:
+        return False
+    if {k: v for k, v in stamp.items() if k != "revision"} != fingerprint:
+        return False
+
+    from src.db.migrations import get_current_revision
+
+    try:
+        return get_current_revision() == stamp.get("revision")
+    except Exception:
+        return False
+
+
+def _read_startup_stamp() -> dict | None:
+    """Load the fingerprint saved by the last successful setup."""
+    try:
+        with open(STARTUP_STAMP_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_startup_stamp(fingerprint: dict | None) -> None:
+    """Save a fingerprint and the head revision; failures only cost the next start a full setup."""
+    if fingerprint is None:
+        return
+    from src.db.migrations import get_head_revision
+
+    try:
+        STARTUP_STAMP_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(STARTUP_STAMP_PATH, "w") as f:
+            json.dump({**fingerprint, "revision": get_head_revision()}, f)
+    except OSError:
+        pass
+
+
+def setup_database(db: Session):
+    """Set up database and return demo customer context using the given session."""
+    from src.db.seed import get_demo_customer
     from src.agent.context import CustomerContext
 
-    # Run migrations
+    if not _stamp_matches(_startup_fingerprint(), _read_startup_stamp()):
+        if _prepare_database(db):
+            _write_startup_stamp(_startup_fingerprint())
+
+    customer = get_demo_customer(db)
+    if customer:
+        context = CustomerContext.from_customer(customer)
+        return context, customer.id
+
+    return None, None
+
+
+def _prepare_database(db: Session) -> bool:
+    """Run pending migrations and seed demo data. Returns whether migrations succeeded."""
+    from src.db.migrations import needs_migration, run_migrations
+    from src.db.seed import seed_demo_data, has_demo_data
+
+    # Run migrations; skip the full upgrade when already at head
+    migrated = True
     try:
-        run_migrations()
+        if needs_migration():
+            run_migrations()
     except Exception as e:
         # Tables might already exist
-        pass
+        migrated = False
 
     # Get or create demo customer
-    with get_db_session() as db:
-        if not has_demo_data(db):
-            seed_demo_data(db)
-
-        customer = get_demo_customer(db)
-        if customer:
-            context = CustomerContext.from_customer(customer)
-            return context, customer.id
+    if not has_demo_data(db):
+        seed_demo_data(db)
 
-    return None, None
+    return migrated
 
 
 def main() -> None:
@@ -59,19 +136,26 @@ def main() -> None:
         console.print("[yellow]Running in mock mode - no API keys required.[/yellow]")
         console.print("[dim]Set MOCK_MODE=0 and add API keys to .env for real mode.[/dim]\n")
 
-    # Set up database and get customer context
+    # One session serves setup and the whole chat loop
+    from src.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        _run(console, db)
+    finally:
+        db.close()
+
+
+def _run(console: Console, db: Session) -> None:
+    """Set up the customer context and run the chat loop."""
     console.print("[dim]Setting up database...[/dim]")
-    context, customer_id = setup_database()
+    context, customer_id = setup_database(db)
 
     if context:
         console.print(f"[dim]Loaded customer: {context.store_name} ({context.plan_tier} plan)[/dim]")
         console.print(f"[dim]Labels used: {context.labels_used}/{context.labels_limit}[/dim]\n")
 
     try:
-        # Create agent with database connection
-        from src.db.database import SessionLocal
-
-        db = SessionLocal()
         agent = ShippingAgent(context=context, db=db if context else None)
     except ValueError as e:
         console.print(f"[red]Setup error:[/red] {e}")
@@ -83,60 +167,55 @@ def main() -> None:
     console.print("[dim]Try: 'Get rates for a 2lb package to Los Angeles, CA 90001'[/dim]")
     console.print("[dim]Or: 'Show my unfulfilled orders'[/dim]\n")
 
-    try:
-        while True:
-            try:
-                user_input = console.input("[bold green]You:[/bold green] ").strip()
-            except (KeyboardInterrupt, EOFError):
-                console.print("\n[dim]Goodbye![/dim]")
-                break
-
-            if not user_input:
-                continue
-
-            if user_input.lower() == "quit":
-                console.print("[dim]Goodbye![/dim]")
-                break
-
-            if user_input.lower() == "reset":
-                agent.reset()
-                console.print("[dim]Conversation cleared.[/dim]\n")
-                continue
-
-            if user_input.lower() == "help":
-                console.print(Panel(
-                    "**Commands:**\n"
-                    "- `quit` - Exit the agent\n"
-                    "- `reset` - Clear conversation history\n"
-                    "- `help` - Show this message\n\n"
-                    "**Examples:**\n"
-                    "- Show my unfulfilled orders\n"
-                    "- Get rates for a 2lb package to Chicago, IL 60601\n"
-                    "- Validate address: 123 Main St, Los Angeles, CA 90001\n"
-                    "- Ship it with the cheapest option\n"
-                    "- What's the fastest way to ship to NYC?",
-                    title="Help",
-                    border_style="dim",
-                ))
-                console.print()
-                continue
-
-            try:
-                with console.status("[bold blue]Thinking...[/bold blue]"):
-                    response = agent.chat(user_input)
-                console.print()
-                console.print(Panel(
-                    Markdown(response),
-                    title="[bold blue]Agent[/bold blue]",
-                    border_style="blue",
-                ))
-                console.print()
-            except Exception as e:
-                console.print(f"[red]Error:[/red] {e}\n")
-    finally:
-        # Clean up database session
-        if context:
-            db.close()
+    while True:
+        try:
+            user_input = console.input("[bold green]You:[/bold green] ").strip()
+        except (KeyboardInterrupt, EOFError):
+            console.print("\n[dim]Goodbye![/dim]")
+            break
+
+        if not user_input:
+            continue
+
+        if user_input.lower() == "quit":
+            console.print("[dim]Goodbye![/dim]")
+            break
+
+        if user_input.lower() == "reset":
+            agent.reset()
+            console.print("[dim]Conversation cleared.[/dim]\n")
+            continue
+
+        if user_input.lower() == "help":
+            console.print(Panel(
+                "**Commands:**\n"
+                "- `quit` - Exit the agent\n"
+                "- `reset` - Clear conversation history\n"
+                "- `help` - Show this message\n\n"
+                "**Examples:**\n"
+                "- Show my unfulfilled orders\n"
+                "- Get rates for a 2lb package to Chicago, IL 60601\n"
+                "- Validate address: 123 Main St, Los Angeles, CA 90001\n"
+                "- Ship it with the cheapest option\n"
+                "- What's the fastest way to ship to NYC?",
+                title="Help",
+                border_style="dim",
+            ))
+            console.print()
+            continue
+
+        try:
+            with console.status("[bold blue]Thinking...[/bold blue]"):
+                response = agent.chat(user_input)
+            console.print()
+            console.print(Panel(
+                Markdown(response),
+                title="[bold blue]Agent[/bold blue]",
+                border_style="blue",
+            ))
+            console.print()
+        except Exception as e:
+            console.print(f"[red]Error:[/red] {e}\n")
 
 
 if __name__ == "__main__":
@@ -10,6 +10,7 @@ from alembic import context
 
 # Import models to register them with metadata
 from src.db.models import Base
+from src.db.database import normalize_database_url
 
 # this is the Alembic Config object
 config = context.config
@@ -24,7 +25,9 @@ target_metadata = Base.metadata
 
 def get_url() -> str:
     """Get database URL from environment or config."""
-    return os.getenv("DATABASE_URL", config.get_main_option("sqlalchemy.url"))
+    return normalize_database_url(
+        os.getenv("DATABASE_URL", config.get_main_option("sqlalchemy.url"))
+    )
 
 
 def run_migrations_offline() -> None:
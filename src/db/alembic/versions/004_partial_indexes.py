@@ -0,0 +1,49 @@
+"""Replace low-selectivity indexes with partial indexes.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOKEN_INVALID = sa.text("token_invalid = 1")
+UNFULFILLED = sa.text("status = 'unfulfilled'")
+
+
+def upgrade() -> None:
+    # A two-value flag index covers every customer; index only the invalid
+    # ones, ordered by when they were last checked
+    op.drop_index("ix_customers_token_invalid", "customers")
+    op.create_index(
+        "ix_customers_token_invalid",
+        "customers",
+        ["token_validated_at"],
+        postgresql_where=TOKEN_INVALID,
+        sqlite_where=TOKEN_INVALID,
+    )
+
+    # Unfulfilled order listing filters on status and sorts by created_at
+    op.create_index(
+        "ix_orders_unfulfilled",
+        "orders",
+        ["customer_id", "created_at"],
+        postgresql_where=UNFULFILLED,
+        sqlite_where=UNFULFILLED,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_orders_unfulfilled", "orders")
+    op.drop_index("ix_customers_token_invalid", "customers")
+    op.create_index("ix_customers_token_invalid", "customers", ["token_invalid"])
@@ -0,0 +1,44 @@
+"""Store JSON columns as JSONB on PostgreSQL.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSON_COLUMNS = (
+    ("customers", "default_from_address"),
+    ("orders", "shipping_address"),
+    ("orders", "line_items"),
+    ("conversations", "messages"),
+    ("tracking_events", "location"),
+)
+
+
+def _alter_json_columns(type_name: str) -> None:
+    # SQLite stores JSON as text either way
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for table, column in JSON_COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} "
+            f"TYPE {type_name} USING {column}::{type_name}"
+        )
+
+
+def upgrade() -> None:
+    _alter_json_columns("jsonb")
+
+
+def downgrade() -> None:
+    _alter_json_columns("json")
@@ -0,0 +1,57 @@
+"""Store customers.token_invalid as a native boolean on PostgreSQL.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate_invalid_index(predicate: str) -> None:
+    op.create_index(
+        "ix_customers_token_invalid",
+        "customers",
+        ["token_validated_at"],
+        postgresql_where=sa.text(predicate),
+    )
+
+
+def upgrade() -> None:
+    # SQLite has no boolean type; 0/1 integers are what Boolean maps to there
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # The partial index predicate compares against an integer, rebuild it
+    op.drop_index("ix_customers_token_invalid", "customers")
+    op.execute("ALTER TABLE customers ALTER COLUMN token_invalid DROP DEFAULT")
+    op.execute(
+        "ALTER TABLE customers ALTER COLUMN token_invalid "
+        "TYPE boolean USING (token_invalid <> 0)"
+    )
+    op.execute("ALTER TABLE customers ALTER COLUMN token_invalid SET DEFAULT false")
+    _recreate_invalid_index("token_invalid")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.drop_index("ix_customers_token_invalid", "customers")
+    op.execute("ALTER TABLE customers ALTER COLUMN token_invalid DROP DEFAULT")
+    op.execute(
+        "ALTER TABLE customers ALTER COLUMN token_invalid "
+        "TYPE integer USING (CASE WHEN token_invalid THEN 1 ELSE 0 END)"
+    )
+    op.execute("ALTER TABLE customers ALTER COLUMN token_invalid SET DEFAULT 0")
+    _recreate_invalid_index("token_invalid = 1")
@@ -0,0 +1,63 @@
+"""Store UUIDs as 16 raw bytes instead of 32-char hex on non-PostgreSQL databases.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+
+"""
+import uuid
+from typing import Callable, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UUID_COLUMNS = {
+    "customers": ("id",),
+    "orders": ("id", "customer_id"),
+    "shipments": ("id", "customer_id", "order_id"),
+    "conversations": ("id", "customer_id"),
+    "tracking_events": ("id", "shipment_id"),
+}
+
+
+def _to_bytes(value):
+    return uuid.UUID(value).bytes if isinstance(value, str) else value
+
+
+def _to_hex(value):
+    return uuid.UUID(bytes=value).hex if isinstance(value, bytes) else value
+
+
+def _convert(convert: Callable) -> None:
+    # PostgreSQL keeps its native uuid type
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        return
+
+    # Keys and foreign keys are rewritten together, table by table, so
+    # every reference still matches once the migration commits
+    for table, columns in UUID_COLUMNS.items():
+        column_list = ", ".join(columns)
+        rows = bind.execute(sa.text(f"SELECT {column_list} FROM {table}")).all()
+        assignments = ", ".join(f"{column} = :{column}" for column in columns)
+        params = [
+            {"old_id": row[0], **{column: convert(value) for column, value in zip(columns, row)}}
+            for row in rows
+        ]
+        if params:
+            bind.execute(sa.text(f"UPDATE {table} SET {assignments} WHERE id = :old_id"), params)
+
+
+def upgrade() -> None:
+    _convert(_to_bytes)
+
+
+def downgrade() -> None:
+    _convert(_to_hex)
@@ -0,0 +1,39 @@
+"""Add composite indexes matching the list queries' filter and sort.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Status-filtered order lists sort by created_at; the trailing key lets
+    # ORDER BY ... LIMIT read the index in order (either direction)
+    op.drop_index("ix_orders_customer_status", "orders")
+    op.create_index(
+        "ix_orders_customer_status_created", "orders", ["customer_id", "status", "created_at"]
+    )
+    op.create_index("ix_orders_customer_created", "orders", ["customer_id", "created_at"])
+    op.create_index("ix_shipments_customer_created", "shipments", ["customer_id", "created_at"])
+    op.create_index(
+        "ix_tracking_events_shipment_occurred", "tracking_events", ["shipment_id", "occurred_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tracking_events_shipment_occurred", "tracking_events")
+    op.drop_index("ix_shipments_customer_created", "shipments")
+    op.drop_index("ix_orders_customer_created", "orders")
+    op.drop_index("ix_orders_customer_status_created", "orders")
+    op.create_index("ix_orders_customer_status", "orders", ["customer_id", "status"])
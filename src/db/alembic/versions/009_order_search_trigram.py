@@ -0,0 +1,45 @@
+"""Add trigram indexes for order search on PostgreSQL.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns matched by OrderRepository.list_unfulfilled(search=...)
+SEARCH_COLUMNS = ("recipient_name", "order_number", "shopify_order_id")
+
+
+def upgrade() -> None:
+    # ILIKE '%term%' can use a trigram GIN index on PostgreSQL. SQLite has
+    # no index type that serves a leading-wildcard LIKE, so it is skipped
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f"ix_orders_{column}_trgm",
+            "orders",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for column in SEARCH_COLUMNS:
+        op.drop_index(f"ix_orders_{column}_trgm", "orders")
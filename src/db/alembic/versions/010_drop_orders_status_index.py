@@ -0,0 +1,30 @@
+"""Drop the redundant customer/status/created_at order index.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Unfulfilled lists use the partial ix_orders_unfulfilled (004) and every
+    # other order list uses ix_orders_customer_created (008), filtering status
+    # within one customer's rows; the extra index only slowed writes
+    op.drop_index("ix_orders_customer_status_created", "orders")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_orders_customer_status_created", "orders", ["customer_id", "status", "created_at"]
+    )
@@ -4,36 +4,119 @@ import os
 from contextlib import contextmanager
 from typing import Generator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import Session, sessionmaker
 
 from src.db.models import Base
 
+try:
+    import orjson
+except ImportError:  # optional "speedups" extra
+    orjson = None
+
+
+# Bare PostgreSQL URLs select psycopg2 in SQLAlchemy; prefer psycopg 3
+# when it is installed (the `postgres` extra)
+POSTGRES_URL_PREFIXES = ("postgresql://", "postgres://")
+PSYCOPG_URL_PREFIX = "postgresql+psycopg://"
+
+
+def normalize_database_url(url: str) -> str:
+    """Point bare PostgreSQL URLs at the psycopg 3 driver when available."""
+    if not url.startswith(POSTGRES_URL_PREFIXES):
+        return url
+    try:
+        import psycopg  # noqa: F401
+    except ImportError:
+        return url
+    return PSYCOPG_URL_PREFIX + url.split("://", 1)[1]
+
 
 def get_database_url() -> str:
     """Get database URL from environment or use default SQLite."""
-    return os.getenv("DATABASE_URL", "sqlite:///./shipping_agent.db")
+    return normalize_database_url(os.getenv("DATABASE_URL", "sqlite:///./shipping_agent.db"))
+
+
+# Applied to every new SQLite connection: WAL lets readers run alongside
+# a writer, and synchronous=NORMAL only fsyncs at checkpoints in WAL mode
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+# Compiled-statement cache entries per engine; sized above SQLAlchemy's
+# default of 500 so the repositories' fixed set of queries stays cached
+QUERY_CACHE_SIZE = 1200
+
+# psycopg2 runs executemany UPDATE/DELETE one statement per row unless
+# batched with execute_batch; INSERTs already use multi-row VALUES
+PSYCOPG2_ENGINE_OPTIONS = {
+    "executemany_mode": "values_plus_batch",
+    "executemany_batch_page_size": 500,
+    "insertmanyvalues_page_size": 1000,
+}
+
+
+def _json_engine_options() -> dict:
+    """JSON column (de)serializers for the engine; orjson when installed."""
+    if orjson is None:
+        return {}
+    return {
+        "json_serializer": lambda value: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode(),
+        "json_deserializer": orjson.loads,
+    }
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    """Whether a SQLite URL points at an in-memory database."""
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
 
 
 def create_db_engine(database_url: str | None = None):
     """Create database engine with appropriate settings."""
-    url = database_url or get_database_url()
+    url = normalize_database_url(database_url or get_database_url())
 
     # SQLite-specific settings
     if url.startswith("sqlite"):
-        return create_engine(
+        db_engine = create_engine(
             url,
             connect_args={"check_same_thread": False},
             echo=os.getenv("SQL_ECHO", "").lower() == "true",
+            query_cache_size=QUERY_CACHE_SIZE,
+            **_json_engine_options(),
         )
+        pragmas = SQLITE_PRAGMAS
+        if not _is_memory_sqlite(url):
+            pragmas = ("PRAGMA journal_mode=WAL",) + pragmas
+
+        @event.listens_for(db_engine, "connect")
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+        return db_engine
 
     # PostgreSQL settings
+    driver_options = {}
+    if make_url(url).get_driver_name() == "psycopg2":
+        driver_options = PSYCOPG2_ENGINE_OPTIONS
+
     return create_engine(
         url,
         pool_size=5,
         max_overflow=10,
         pool_pre_ping=True,
         echo=os.getenv("SQL_ECHO", "").lower() == "true",
+        query_cache_size=QUERY_CACHE_SIZE,
+        **_json_engine_options(),
+        **driver_options,
     )
 
 
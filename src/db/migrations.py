@@ -1,22 +1,31 @@
 """Migration utilities for programmatic migration running."""
 
 import os
+from functools import lru_cache
 from pathlib import Path
 
 from alembic import command
 from alembic.config import Config
 
+from src.db.database import normalize_database_url
+
+# Path to alembic.ini relative to this file
+ALEMBIC_INI_PATH = Path(__file__).parent / "alembic.ini"
+
 
 def get_alembic_config() -> Config:
     """Get Alembic config pointing to our migration setup."""
-    # Path to alembic.ini relative to this file
-    ini_path = Path(__file__).parent / "alembic.ini"
-    config = Config(str(ini_path))
+    return _alembic_config(os.getenv("DATABASE_URL"))
+
+
+@lru_cache(maxsize=4)
+def _alembic_config(database_url: str | None) -> Config:
+    """Parse alembic.ini once per DATABASE_URL value."""
+    config = Config(str(ALEMBIC_INI_PATH))
 
     # Override sqlalchemy.url with environment variable if set
-    database_url = os.getenv("DATABASE_URL")
     if database_url:
-        config.set_main_option("sqlalchemy.url", database_url)
+        config.set_main_option("sqlalchemy.url", normalize_database_url(database_url))
 
     return config
 
@@ -36,21 +45,46 @@ def downgrade_migrations(revision: str = "-1") -> None:
 def get_current_revision() -> str | None:
     """Get the current migration revision."""
     config = get_alembic_config()
-    from alembic.script import ScriptDirectory
     from alembic.runtime.migration import MigrationContext
     from sqlalchemy import create_engine
+    from src.db.database import engine as app_engine
 
-    script = ScriptDirectory.from_config(config)
     url = config.get_main_option("sqlalchemy.url")
 
+    # Borrow a pooled connection when the app engine already points here
+    if app_engine.url.render_as_string(hide_password=False) == url:
+        with app_engine.connect() as conn:
+            return MigrationContext.configure(conn).get_current_revision()
+
     connect_args = {}
     if url.startswith("sqlite"):
         connect_args["check_same_thread"] = False
 
     engine = create_engine(url, connect_args=connect_args)
-    with engine.connect() as conn:
-        context = MigrationContext.configure(conn)
-        return context.get_current_revision()
+    try:
+        with engine.connect() as conn:
+            context = MigrationContext.configure(conn)
+            return context.get_current_revision()
+    finally:
+        engine.dispose()
+
+
+def get_head_revision() -> str | None:
+    """Get the latest revision available in the migration scripts."""
+    return _script_directory().get_current_head()
+
+
+@lru_cache(maxsize=1)
+def _script_directory():
+    """Scan the migration scripts once; they don't change while running."""
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(get_alembic_config())
+
+
+def needs_migration() -> bool:
+    """Whether the database is behind the latest migration."""
+    return get_current_revision() != get_head_revision()
 
 
 def create_revision(message: str, autogenerate: bool = True) -> None:
@@ -10,6 +10,7 @@ def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 from sqlalchemy import (
+    Boolean,
     Column,
     String,
     Integer,
@@ -19,44 +20,64 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
 )
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID
-from sqlalchemy.types import TypeDecorator, CHAR
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
+from sqlalchemy.types import BINARY, TypeDecorator
 from sqlalchemy.orm import DeclarativeBase, relationship
 from sqlalchemy import JSON
 
 
+# Stored as binary JSONB on PostgreSQL so reads skip re-parsing text
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+
 class UUID(TypeDecorator):
     """Platform-independent UUID type.
 
-    Uses PostgreSQL's UUID type when available, otherwise stores as CHAR(32).
+    Uses PostgreSQL's UUID type when available, otherwise stores the
+    16 raw bytes as BINARY(16).
     """
 
-    impl = CHAR
+    impl = BINARY(16)
     cache_ok = True
 
     def load_dialect_impl(self, dialect):
         if dialect.name == "postgresql":
             return dialect.type_descriptor(PG_UUID(as_uuid=True))
         else:
-            return dialect.type_descriptor(CHAR(32))
+            return dialect.type_descriptor(BINARY(16))
 
-    def process_bind_param(self, value, dialect):
-        if value is None:
-            return value
-        elif dialect.name == "postgresql":
-            return value
-        else:
-            if isinstance(value, uuid.UUID):
-                return value.hex
-            else:
-                return uuid.UUID(value).hex
+    # bind_processor / result_processor run once per dialect and return
+    # per-value functions, so the dialect check isn't repeated per row
+
+    def bind_processor(self, dialect):
+        impl_processor = self.load_dialect_impl(dialect).bind_processor(dialect)
+        if dialect.name == "postgresql":
+            return impl_processor
+
+        def process(value):
+            if value is None:
+                return value
+            raw = value.bytes if isinstance(value, uuid.UUID) else uuid.UUID(value).bytes
+            return impl_processor(raw) if impl_processor else raw
+
+        return process
+
+    def result_processor(self, dialect, coltype):
+        impl_processor = self.load_dialect_impl(dialect).result_processor(dialect, coltype)
+        if dialect.name == "postgresql":
+            return impl_processor
+
+        def process(value):
+            if impl_processor:
+                value = impl_processor(value)
+            if value is None or isinstance(value, uuid.UUID):
+                return value
+            if isinstance(value, bytes):
+                return uuid.UUID(bytes=value)
+            # Hex text written before migration 007
+            return uuid.UUID(value)
 
-    def process_result_value(self, value, dialect):
-        if value is None:
-            return value
-        if isinstance(value, uuid.UUID):
-            return value
-        return uuid.UUID(value)
+        return process
 
 
 class Base(DeclarativeBase):
@@ -78,7 +99,7 @@ class Customer(Base):
     labels_this_month = Column(Integer, default=0)
     labels_limit = Column(Integer, default=50)
     easypost_api_key = Column(Text)
-    default_from_address = Column(JSON)
+    default_from_address = Column(JSONType)
 
     # Shopify OAuth fields
     shopify_access_token = Column(Text)  # Encrypted access token
@@ -89,7 +110,7 @@ class Customer(Base):
 
     # Token validation fields
     token_validated_at = Column(DateTime)  # Last time token was verified with Shopify
-    token_invalid = Column(Integer, default=0)  # Flag for invalid/revoked tokens (0=valid, 1=invalid)
+    token_invalid = Column(Boolean, default=False, nullable=False)  # Flag for invalid/revoked tokens
 
     created_at = Column(DateTime, default=utc_now)
     updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
@@ -114,8 +135,8 @@ class Order(Base):
     order_number = Column(String(100))
     recipient_name = Column(String(255))
     status = Column(String(50), default="unfulfilled")
-    shipping_address = Column(JSON)
-    line_items = Column(JSON)
+    shipping_address = Column(JSONType)
+    line_items = Column(JSONType)
     weight_oz = Column(Float)
     created_at = Column(DateTime, default=utc_now)
     updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
@@ -167,7 +188,7 @@ class Conversation(Base):
 
     id = Column(UUID(), primary_key=True, default=uuid.uuid4)
     customer_id = Column(UUID(), ForeignKey("customers.id", ondelete="CASCADE"), nullable=False, unique=True)
-    messages = Column(JSON, default=list)
+    messages = Column(JSONType, default=list)
     created_at = Column(DateTime, default=utc_now)
     updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
 
@@ -188,7 +209,7 @@ class TrackingEvent(Base):
     shipment_id = Column(UUID(), ForeignKey("shipments.id", ondelete="CASCADE"), nullable=False)
     status = Column(String(100), nullable=False)
     description = Column(Text)
-    location = Column(JSON)
+    location = Column(JSONType)
     occurred_at = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=utc_now)
 
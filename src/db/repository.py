@@ -1,14 +1,61 @@
 """Repository classes for data access."""
 
 from datetime import datetime, timezone
-from typing import Any
+from itertools import islice
+from typing import Any, Iterable, Iterator
 from uuid import UUID
 
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
+from sqlalchemy import JSON, bindparam, cast, func, insert, or_, select, type_coerce, update
+from sqlalchemy.dialects.postgresql import JSONB, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, raiseload, selectinload
 
 from src.db.models import Customer, Order, Shipment, Conversation, TrackingEvent
 
+# Dialect-specific INSERT constructs that support ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {
+    "postgresql": pg_insert,
+    "sqlite": sqlite_insert,
+}
+
+
+def _append_json_sqlite(column, value):
+    """json_insert at '$[#]' adds the value as the array's last element."""
+    return func.json_insert(
+        func.coalesce(column, func.json_array()),
+        "$[#]",
+        func.json(type_coerce(value, JSON)),
+    )
+
+
+def _append_json_postgresql(column, value):
+    """Wrapping the value in an array keeps || from merging its contents."""
+    return func.coalesce(column, func.jsonb_build_array()).op("||")(
+        func.jsonb_build_array(cast(value, JSONB))
+    )
+
+
+# SQL expressions that append one element to a JSON array column in place
+JSON_APPENDS = {
+    "postgresql": _append_json_postgresql,
+    "sqlite": _append_json_sqlite,
+}
+
+# Opt-in for list queries: raise on lazy relationship access instead of issuing
+# one SELECT per row. The option sticks to instances in the session's identity
+# map, so only request-scoped sessions that never touch relationships use it.
+NO_LAZY_LOADS = raiseload("*")
+
+# Webhook lookups run on every request; build these statements once
+CUSTOMER_BY_SHOP_DOMAIN = select(Customer).where(Customer.shop_domain == bindparam("domain")).limit(1)
+SHIPMENT_BY_TRACKING_NUMBER = (
+    select(Shipment).where(Shipment.tracking_number == bindparam("tracking_number")).limit(1)
+)
+
+# Rows per executemany batch in bulk inserts; SQLAlchemy further splits
+# each batch into multi-row INSERT statements (insertmanyvalues)
+BULK_INSERT_CHUNK_SIZE = 1000
+
 
 class CustomerRepository:
     """Repository for customer data access."""
@@ -18,46 +65,85 @@ class CustomerRepository:
 
     def get_by_id(self, id: UUID) -> Customer | None:
         """Get customer by ID."""
-        return self.db.query(Customer).filter(Customer.id == id).first()
+        return self.db.get(Customer, id)
 
     def get_by_shop_domain(self, domain: str) -> Customer | None:
         """Get customer by Shopify shop domain."""
-        return self.db.query(Customer).filter(Customer.shop_domain == domain).first()
+        return self.db.execute(CUSTOMER_BY_SHOP_DOMAIN, {"domain": domain}).scalar_one_or_none()
 
-    def create(self, data: dict[str, Any]) -> Customer:
-        """Create a new customer."""
+    def create(self, data: dict[str, Any], commit: bool = True) -> Customer:
+        """Create a new customer.
+
+        With commit=False the row is only flushed, leaving the caller's
+        transaction open.
+        """
         customer = Customer(**data)
         self.db.add(customer)
+        if not commit:
+            self.db.flush()
+            return customer
         self.db.commit()
         self.db.refresh(customer)
         return customer
 
     def update(self, id: UUID, data: dict[str, Any]) -> Customer | None:
-        """Update customer fields."""
-        customer = self.get_by_id(id)
-        if customer:
-            for key, value in data.items():
-                setattr(customer, key, value)
-            customer.updated_at = datetime.now(timezone.utc)
-            self.db.commit()
-            self.db.refresh(customer)
+        """Update customer fields with one UPDATE ... RETURNING."""
+        stmt = (
+            update(Customer)
+            .where(Customer.id == id)
+            .values(**data, updated_at=datetime.now(timezone.utc))
+            .returning(Customer)
+        )
+        customer = self.db.execute(stmt).scalar_one_or_none()
+        self.db.commit()
         return customer
 
+    def _update_columns(self, id: UUID, **values: Any) -> None:
+        """Set columns (and updated_at) with one UPDATE, no SELECT first."""
+        values["updated_at"] = datetime.now(timezone.utc)
+        self.db.execute(update(Customer).where(Customer.id == id).values(**values))
+        self.db.commit()
+
     def update_label_count(self, id: UUID, count: int) -> None:
         """Update labels_this_month count."""
-        customer = self.get_by_id(id)
-        if customer:
-            customer.labels_this_month = count
-            customer.updated_at = datetime.now(timezone.utc)
-            self.db.commit()
+        self._update_columns(id, labels_this_month=count)
 
     def increment_label_count(self, id: UUID, increment: int = 1) -> None:
         """Increment labels_this_month count."""
-        customer = self.get_by_id(id)
-        if customer:
-            customer.labels_this_month += increment
-            customer.updated_at = datetime.now(timezone.utc)
-            self.db.commit()
+        # Added in SQL so concurrent increments can't overwrite each other
+        self._update_columns(id, labels_this_month=Customer.labels_this_month + increment)
+
+    def try_consume_label(self, id: UUID) -> int | None:
+        """Atomically use one label if under the monthly limit.
+
+        Returns the new labels_this_month count, or None if the limit
+        is already reached (or the customer doesn't exist).
+        """
+        stmt = (
+            update(Customer)
+            .where(Customer.id == id, Customer.labels_this_month < Customer.labels_limit)
+            .values(
+                labels_this_month=Customer.labels_this_month + 1,
+                updated_at=datetime.now(timezone.utc),
+            )
+            .returning(Customer.labels_this_month)
+        )
+        count = self.db.execute(stmt).scalar_one_or_none()
+        self.db.commit()
+        return count
+
+    def release_label(self, id: UUID) -> None:
+        """Give back a label taken by try_consume_label."""
+        stmt = (
+            update(Customer)
+            .where(Customer.id == id, Customer.labels_this_month > 0)
+            .values(
+                labels_this_month=Customer.labels_this_month - 1,
+                updated_at=datetime.now(timezone.utc),
+            )
+        )
+        self.db.execute(stmt)
+        self.db.commit()
 
     def list_all(self, limit: int = 100) -> list[Customer]:
         """List all customers."""
@@ -65,28 +151,15 @@ class CustomerRepository:
 
     def mark_token_invalid(self, id: UUID) -> None:
         """Mark a customer's Shopify token as invalid."""
-        customer = self.get_by_id(id)
-        if customer:
-            customer.token_invalid = 1
-            customer.updated_at = datetime.now(timezone.utc)
-            self.db.commit()
+        self._update_columns(id, token_invalid=True)
 
     def mark_token_valid(self, id: UUID) -> None:
         """Mark a customer's Shopify token as valid and update validated timestamp."""
-        customer = self.get_by_id(id)
-        if customer:
-            customer.token_invalid = 0
-            customer.token_validated_at = datetime.now(timezone.utc)
-            customer.updated_at = datetime.now(timezone.utc)
-            self.db.commit()
+        self._update_columns(id, token_invalid=False, token_validated_at=datetime.now(timezone.utc))
 
     def update_token_validated_at(self, id: UUID) -> None:
         """Update the token_validated_at timestamp."""
-        customer = self.get_by_id(id)
-        if customer:
-            customer.token_validated_at = datetime.now(timezone.utc)
-            customer.updated_at = datetime.now(timezone.utc)
-            self.db.commit()
+        self._update_columns(id, token_validated_at=datetime.now(timezone.utc))
 
 
 class OrderRepository:
@@ -97,7 +170,15 @@ class OrderRepository:
 
     def get_by_id(self, id: UUID) -> Order | None:
         """Get order by ID."""
-        return self.db.query(Order).filter(Order.id == id).first()
+        return self.db.get(Order, id)
+
+    def get_for_customer(self, id: UUID, customer_id: UUID) -> Order | None:
+        """Get order by ID, only if it belongs to the given customer."""
+        return (
+            self.db.query(Order)
+            .filter(Order.id == id, Order.customer_id == customer_id)
+            .first()
+        )
 
     def get_by_shopify_id(self, customer_id: UUID, shopify_order_id: str) -> Order | None:
         """Get order by Shopify order ID for a specific customer."""
@@ -112,12 +193,15 @@ class OrderRepository:
         customer_id: UUID,
         limit: int = 20,
         search: str | None = None,
+        with_shipment: bool = False,
+        no_lazy_loads: bool = False,
     ) -> list[Order]:
         """List unfulfilled orders for a customer."""
         query = self.db.query(Order).filter(
             Order.customer_id == customer_id,
             Order.status == "unfulfilled",
         )
+        query = self._with_loaders(query, with_shipment, no_lazy_loads)
 
         if search:
             search_term = f"%{search}%"
@@ -136,15 +220,47 @@ class OrderRepository:
         customer_id: UUID,
         limit: int = 50,
         status: str | None = None,
+        with_shipment: bool = False,
+        no_lazy_loads: bool = False,
     ) -> list[Order]:
         """List orders for a customer with optional status filter."""
         query = self.db.query(Order).filter(Order.customer_id == customer_id)
+        query = self._with_loaders(query, with_shipment, no_lazy_loads)
 
         if status:
             query = query.filter(Order.status == status)
 
         return query.order_by(Order.created_at.desc()).limit(limit).all()
 
+    def iter_by_customer(
+        self,
+        customer_id: UUID,
+        status: str | None = None,
+        chunk_size: int = 200,
+        no_lazy_loads: bool = False,
+    ) -> Iterator[Order]:
+        """Stream a customer's orders, newest first, chunk_size rows at a time.
+
+        Unlike list_by_customer there is no limit; memory stays bounded by
+        the chunk size (a server-side cursor on PostgreSQL).
+        """
+        stmt = select(Order).where(Order.customer_id == customer_id)
+        if status:
+            stmt = stmt.where(Order.status == status)
+        if no_lazy_loads:
+            stmt = stmt.options(NO_LAZY_LOADS)
+        stmt = stmt.order_by(Order.created_at.desc()).execution_options(yield_per=chunk_size)
+        yield from self.db.scalars(stmt)
+
+    @staticmethod
+    def _with_loaders(query, with_shipment: bool, no_lazy_loads: bool):
+        """Load shipments in one extra SELECT and forbid other lazy loads, if asked."""
+        if with_shipment:
+            query = query.options(selectinload(Order.shipment))
+        if no_lazy_loads:
+            query = query.options(NO_LAZY_LOADS)
+        return query
+
     def create(self, data: dict[str, Any]) -> Order:
         """Create a new order."""
         order = Order(**data)
@@ -153,14 +269,74 @@ class OrderRepository:
         self.db.refresh(order)
         return order
 
-    def update_status(self, id: UUID, status: str) -> Order | None:
-        """Update order status."""
-        order = self.get_by_id(id)
-        if order:
-            order.status = status
-            order.updated_at = datetime.now(timezone.utc)
+    def bulk_create(self, rows: Iterable[dict[str, Any]], commit: bool = True) -> int:
+        """Insert many orders with batched executemany and a single commit.
+
+        Every row must have the same keys. Returns the number of rows inserted.
+        With commit=False the caller's transaction is left open.
+        """
+        rows = iter(rows)
+        count = 0
+        while chunk := list(islice(rows, BULK_INSERT_CHUNK_SIZE)):
+            self.db.execute(insert(Order), chunk)
+            count += len(chunk)
+        if count and commit:
             self.db.commit()
-            self.db.refresh(order)
+        return count
+
+    def upsert_by_shopify_id(self, data: dict[str, Any]) -> None:
+        """Create an order, or update it if the Shopify order already exists.
+
+        Runs as a single INSERT ... ON CONFLICT DO UPDATE against the
+        (customer_id, shopify_order_id) unique constraint.
+        """
+        dialect_insert = UPSERT_INSERTS.get(self.db.get_bind().dialect.name)
+        if dialect_insert is None:
+            existing = self.get_by_shopify_id(data["customer_id"], data["shopify_order_id"])
+            if existing is None:
+                self.create(data)
+            else:
+                self.update_fields(existing.id, data)
+            return
+
+        stmt = dialect_insert(Order).values(**data)
+        update_values = {
+            key: stmt.excluded[key]
+            for key in data
+            if key not in ("customer_id", "shopify_order_id")
+        }
+        update_values["updated_at"] = datetime.now(timezone.utc)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["customer_id", "shopify_order_id"],
+            set_=update_values,
+        )
+        self.db.execute(stmt)
+        self.db.commit()
+
+    def update_fields(self, id: UUID, data: dict[str, Any]) -> None:
+        """Update order columns with a single UPDATE statement.
+
+        The (customer_id, shopify_order_id) key columns are left untouched.
+        """
+        values = {
+            key: value
+            for key, value in data.items()
+            if key not in ("customer_id", "shopify_order_id")
+        }
+        values["updated_at"] = datetime.now(timezone.utc)
+        self.db.execute(update(Order).where(Order.id == id).values(**values))
+        self.db.commit()
+
+    def update_status(self, id: UUID, status: str) -> Order | None:
+        """Update order status with one UPDATE ... RETURNING."""
+        stmt = (
+            update(Order)
+            .where(Order.id == id)
+            .values(status=status, updated_at=datetime.now(timezone.utc))
+            .returning(Order)
+        )
+        order = self.db.execute(stmt).scalar_one_or_none()
+        self.db.commit()
         return order
 
     def get_by_ids(self, ids: list[UUID]) -> list[Order]:
@@ -176,7 +352,7 @@ class ShipmentRepository:
 
     def get_by_id(self, id: UUID) -> Shipment | None:
         """Get shipment by ID."""
-        return self.db.query(Shipment).filter(Shipment.id == id).first()
+        return self.db.get(Shipment, id)
 
     def get_by_order_id(self, order_id: UUID) -> Shipment | None:
         """Get shipment by order ID."""
@@ -184,17 +360,24 @@ class ShipmentRepository:
 
     def get_by_tracking_number(self, tracking_number: str) -> Shipment | None:
         """Get shipment by tracking number."""
-        return self.db.query(Shipment).filter(Shipment.tracking_number == tracking_number).first()
+        return self.db.execute(
+            SHIPMENT_BY_TRACKING_NUMBER, {"tracking_number": tracking_number}
+        ).scalar_one_or_none()
 
-    def list_by_customer(self, customer_id: UUID, limit: int = 50) -> list[Shipment]:
+    def list_by_customer(
+        self,
+        customer_id: UUID,
+        limit: int = 50,
+        with_tracking_events: bool = False,
+        no_lazy_loads: bool = False,
+    ) -> list[Shipment]:
         """List shipments for a customer."""
-        return (
-            self.db.query(Shipment)
-            .filter(Shipment.customer_id == customer_id)
-            .order_by(Shipment.created_at.desc())
-            .limit(limit)
-            .all()
-        )
+        query = self.db.query(Shipment).filter(Shipment.customer_id == customer_id)
+        if with_tracking_events:
+            query = query.options(selectinload(Shipment.tracking_events))
+        if no_lazy_loads:
+            query = query.options(NO_LAZY_LOADS)
+        return query.order_by(Shipment.created_at.desc()).limit(limit).all()
 
     def create(self, data: dict[str, Any]) -> Shipment:
         """Create a new shipment."""
@@ -205,12 +388,10 @@ class ShipmentRepository:
         return shipment
 
     def update_status(self, id: UUID, status: str) -> Shipment | None:
-        """Update shipment status."""
-        shipment = self.get_by_id(id)
-        if shipment:
-            shipment.status = status
-            self.db.commit()
-            self.db.refresh(shipment)
+        """Update shipment status with one UPDATE ... RETURNING."""
+        stmt = update(Shipment).where(Shipment.id == id).values(status=status).returning(Shipment)
+        shipment = self.db.execute(stmt).scalar_one_or_none()
+        self.db.commit()
         return shipment
 
     def add_tracking_event(
@@ -234,6 +415,31 @@ class ShipmentRepository:
         self.db.refresh(event)
         return event
 
+    def add_tracking_events(self, shipment_id: UUID, events: Iterable[dict[str, Any]]) -> list[UUID]:
+        """Add many tracking events to a shipment in one batched INSERT.
+
+        Each event has "status" and optionally "description", "location"
+        and "occurred_at". Returns the new event IDs in input order.
+        """
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "shipment_id": shipment_id,
+                "status": event["status"],
+                "description": event.get("description"),
+                "location": event.get("location"),
+                "occurred_at": event.get("occurred_at") or now,
+            }
+            for event in events
+        ]
+        if not rows:
+            return []
+
+        stmt = insert(TrackingEvent).returning(TrackingEvent.id, sort_by_parameter_order=True)
+        ids = list(self.db.scalars(stmt, rows))
+        self.db.commit()
+        return ids
+
 
 class ConversationRepository:
     """Repository for conversation data access."""
@@ -243,7 +449,7 @@ class ConversationRepository:
 
     def get_by_id(self, id: UUID) -> Conversation | None:
         """Get conversation by ID."""
-        return self.db.query(Conversation).filter(Conversation.id == id).first()
+        return self.db.get(Conversation, id)
 
     def get_by_customer_id(self, customer_id: UUID) -> Conversation | None:
         """Get conversation for a customer."""
@@ -260,7 +466,26 @@ class ConversationRepository:
         return conversation
 
     def append_message(self, id: UUID, message: dict[str, Any]) -> None:
-        """Append a message to the conversation."""
+        """Append a message to the conversation.
+
+        On SQLite and PostgreSQL the element is appended by the database in
+        one UPDATE, without loading or rewriting the existing history.
+        """
+        append = JSON_APPENDS.get(self.db.get_bind().dialect.name)
+        if append is not None:
+            stmt = (
+                update(Conversation)
+                .where(Conversation.id == id)
+                .values(
+                    messages=append(Conversation.messages, message),
+                    updated_at=datetime.now(timezone.utc),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            self.db.execute(stmt)
+            self.db.commit()
+            return
+
         conversation = self.get_by_id(id)
         if conversation:
             messages = list(conversation.messages) if conversation.messages else []
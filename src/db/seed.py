@@ -2,6 +2,7 @@
 
 import uuid
 from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
 
 from sqlalchemy.orm import Session
 
@@ -16,8 +17,8 @@ from src.agent.context import PLAN_LIMITS
 DEMO_CUSTOMER_ID = uuid.UUID("00000000-0000-0000-0000-000000000001")
 
 
-# Sample orders matching the original MOCK_ORDERS
-DEMO_ORDERS = [
+# Sample orders matching the original MOCK_ORDERS (read-only)
+DEMO_ORDERS = tuple(map(MappingProxyType, [
     {
         "shopify_order_id": "ORD-1001",
         "order_number": "#1001",
@@ -151,10 +152,14 @@ DEMO_ORDERS = [
         "weight_oz": 80,
         "days_ago": 0,
     },
-]
+]))
 
+DEMO_ORDER_IDS = tuple(order_data["shopify_order_id"] for order_data in DEMO_ORDERS)
+DEMO_ORDER_POSITIONS = {shopify_id: i for i, shopify_id in enumerate(DEMO_ORDER_IDS)}
+DEMO_ORDER_AGES = tuple(timedelta(days=order_data["days_ago"]) for order_data in DEMO_ORDERS)
 
-def seed_demo_customer(db: Session) -> Customer:
+
+def seed_demo_customer(db: Session, commit: bool = True) -> Customer:
     """Create the demo customer if it doesn't exist."""
     customer_repo = CustomerRepository(db)
 
@@ -181,31 +186,31 @@ def seed_demo_customer(db: Session) -> Customer:
             "zip": "94105",
             "phone": "555-123-4567",
         },
-    })
+    }, commit=commit)
 
     print(f"Created demo customer: {customer.name}")
     return customer
 
 
-def seed_demo_orders(db: Session, customer_id: uuid.UUID) -> list[Order]:
+def seed_demo_orders(db: Session, customer_id: uuid.UUID, commit: bool = True) -> list[Order]:
     """Create demo orders for the customer."""
-    order_repo = OrderRepository(db)
+    # One query for the orders that already exist
+    existing_ids = {
+        row[0]
+        for row in db.query(Order.shopify_order_id).filter(
+            Order.customer_id == customer_id,
+            Order.shopify_order_id.in_(DEMO_ORDER_IDS),
+        )
+    }
 
-    created_orders = []
     now = datetime.now(timezone.utc)
-
-    for order_data in DEMO_ORDERS:
-        # Check if order already exists
-        existing = order_repo.get_by_shopify_id(customer_id, order_data["shopify_order_id"])
-        if existing:
+    mappings = []
+    for order_data, age in zip(DEMO_ORDERS, DEMO_ORDER_AGES):
+        if order_data["shopify_order_id"] in existing_ids:
             print(f"Order {order_data['order_number']} already exists, skipping")
-            created_orders.append(existing)
             continue
 
-        # Calculate created_at based on days_ago
-        created_at = now - timedelta(days=order_data["days_ago"])
-
-        order = order_repo.create({
+        mappings.append({
             "customer_id": customer_id,
             "shopify_order_id": order_data["shopify_order_id"],
             "order_number": order_data["order_number"],
@@ -214,19 +219,31 @@ def seed_demo_orders(db: Session, customer_id: uuid.UUID) -> list[Order]:
             "line_items": order_data["line_items"],
             "weight_oz": order_data["weight_oz"],
             "status": "unfulfilled",
-            "created_at": created_at,
+            # Calculate created_at based on days_ago
+            "created_at": now - age,
         })
+        print(f"Created order: {order_data['order_number']} - {order_data['recipient_name']}")
 
-        print(f"Created order: {order.order_number} - {order.recipient_name}")
-        created_orders.append(order)
+    # Insert all missing orders in one batch; commits only when commit=True
+    OrderRepository(db).bulk_create(mappings, commit=commit)
 
-    return created_orders
+    orders = (
+        db.query(Order)
+        .filter(Order.customer_id == customer_id, Order.shopify_order_id.in_(DEMO_ORDER_IDS))
+        .all()
+    )
+    return sorted(orders, key=lambda order: DEMO_ORDER_POSITIONS[order.shopify_order_id])
 
 
 def seed_demo_data(db: Session) -> tuple[Customer, list[Order]]:
-    """Seed all demo data."""
-    customer = seed_demo_customer(db)
-    orders = seed_demo_orders(db, customer.id)
+    """Seed all demo data in a single transaction."""
+    try:
+        customer = seed_demo_customer(db, commit=False)
+        orders = seed_demo_orders(db, customer.id, commit=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     return customer, orders
 
 
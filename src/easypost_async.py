@@ -0,0 +1,67 @@
+"""Async fan-out over the EasyPost client for multi-destination requests.
+
+Calls go through the synchronous EasyPostClient on a worker pool rather than
+a native aiohttp client. That adds no aiohttp/aiolimiter dependency, avoids
+duplicating the response mapping, error classification and caches, and
+shares the pooled HTTP session and the process-wide rate limiter with the
+sync batch methods.
+"""
+
+import asyncio
+
+from src.easypost_client import Address, EasyPostClient, Parcel, Rate, submit_rate_limited
+
+
+class AsyncEasyPostClient:
+    """Run EasyPost calls concurrently from async code.
+
+    Each call runs the wrapped client on the worker pool shared with
+    EasyPostClient's batch methods, reusing its pooled HTTP session and its
+    rate limiter, so every client in the process together stays under
+    EasyPost's rate limit.
+    """
+
+    def __init__(self, client: EasyPostClient | None = None):
+        self.client = client or EasyPostClient()
+
+    async def _call(self, func, *args):
+        return await asyncio.wrap_future(submit_rate_limited(func, *args))
+
+    async def get_rates(
+        self,
+        to_address: Address,
+        parcel: Parcel,
+        from_address: Address | None = None,
+    ) -> list[Rate]:
+        """Get shipping rates for a parcel. See EasyPostClient.get_rates."""
+        return await self._call(self.client.get_rates, to_address, parcel, from_address)
+
+    async def get_tracking(self, tracking_number: str, carrier: str) -> dict:
+        """Get tracking info for a shipment. See EasyPostClient.get_tracking."""
+        return await self._call(self.client.get_tracking, tracking_number, carrier)
+
+    async def get_rates_many(
+        self,
+        quotes: list[tuple[Address, Parcel]],
+        from_address: Address | None = None,
+    ) -> list[list[Rate] | Exception]:
+        """Get rates for several destinations concurrently.
+
+        Returns:
+            One entry per request, in order: its rates, or the exception it raised
+        """
+        return await asyncio.gather(
+            *(self.get_rates(to_address, parcel, from_address) for to_address, parcel in quotes),
+            return_exceptions=True,
+        )
+
+    async def get_tracking_many(self, trackers: list[tuple[str, str]]) -> list[dict | Exception]:
+        """Get tracking info for several (tracking_number, carrier) pairs concurrently.
+
+        Returns:
+            One entry per tracker, in order: its tracking info, or the exception it raised
+        """
+        return await asyncio.gather(
+            *(self.get_tracking(number, carrier) for number, carrier in trackers),
+            return_exceptions=True,
+        )
@@ -1,14 +1,139 @@
 """EasyPost API client wrapper."""
 
+import json
 import logging
 import os
-from dataclasses import dataclass
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from heapq import nsmallest
+from operator import attrgetter
+from types import SimpleNamespace
 
 import easypost
+import easypost.requestor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+try:
+    import orjson
+except ImportError:  # optional "speedups" extra
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
 
+def _install_fast_json() -> None:
+    """Have the SDK parse API responses with orjson when it is installed.
+
+    The requestor module calls json.loads / json.dumps through its own
+    ``json`` global, so rebinding that name leaves the stdlib module alone.
+    orjson.JSONDecodeError subclasses json.JSONDecodeError, which the SDK
+    catches for malformed bodies.
+    """
+    if orjson is None:
+        return
+    easypost.requestor.json = SimpleNamespace(loads=orjson.loads, dumps=json.dumps)
+
+
+_install_fast_json()
+
+
+# ============================================================================
+# HTTP Session
+# ============================================================================
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# EasyPost allows about 5 requests per second per API key; batch calls stay
+# under that. The shared session still allows 50 sockets for other callers.
+MAX_CONCURRENT_REQUESTS = 5
+REQUESTS_PER_SECOND = 5
+
+# Quoted rates remembered so a purchase can buy on the quoting shipment
+RATE_SHIPMENT_CACHE_SIZE = 512
+
+# Verified addresses are reused for a day
+ADDRESS_CACHE_SIZE = 2048
+ADDRESS_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Tracking is reused briefly while a package moves, longer once it can't change
+TRACKING_CACHE_SIZE = 4096
+TRACKING_CACHE_TTL_SECONDS = 5 * 60
+FINAL_TRACKING_CACHE_TTL_SECONDS = 60 * 60
+FINAL_TRACKING_STATUSES = frozenset({"delivered", "return_to_sender", "failure", "cancelled"})
+
+# API error text classification (an E.ADDRESS.* code also matches "address")
+ADDRESS_ERROR_PATTERN = re.compile(r"address", re.IGNORECASE)
+TRACKING_NOT_FOUND_PATTERN = re.compile(r"not found|invalid", re.IGNORECASE)
+
+
+class _TTLCache:
+    """Thread-safe dict of expiring entries, dropping the oldest when full."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            return entry[1]
+
+    def set(self, key, value, ttl: float) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                # Dicts keep insertion order, so the first entry is the oldest
+                del self._data[next(iter(self._data))]
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _EasyPostRetry(Retry):
+    """Retry idempotent requests on transient errors, and any request on 429.
+
+    A rate-limited POST was never processed, so it is safe to resend; a POST
+    that hit a 5xx may already have bought a label, so it is not retried.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if status_code == 429 and self.total:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def _build_session() -> requests.Session:
+    """Build the keep-alive session shared by every EasyPost client."""
+    session = requests.Session()
+    retry = _EasyPostRetry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retry))
+    return session
+
+
 # ============================================================================
 # Custom Exceptions
 # ============================================================================
@@ -43,7 +168,7 @@ class AddressValidationError(EasyPostError):
     pass
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Address:
     name: str
     street1: str
@@ -54,8 +179,21 @@ class Address:
     street2: str = ""
     phone: str = ""
 
+    def to_api_dict(self) -> dict:
+        """Serialize to EasyPost's address fields."""
+        return {
+            "name": self.name,
+            "street1": self.street1,
+            "street2": self.street2,
+            "city": self.city,
+            "state": self.state,
+            "zip": self.zip_code,
+            "country": self.country,
+            "phone": self.phone,
+        }
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Parcel:
     length: float  # inches
     width: float   # inches
@@ -63,16 +201,18 @@ class Parcel:
     weight: float  # ounces
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Rate:
     carrier: str
     service: str
     rate: float  # dollars
     delivery_days: int | None
     rate_id: str
+    # EasyPost shipment the rate was quoted on; a rate can only be bought there
+    shipment_id: str = field(default="", repr=False, compare=False)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Shipment:
     id: str
     tracking_number: str
@@ -82,14 +222,95 @@ class Shipment:
     rate: float
 
 
+class _RequestSpacer:
+    """Space request starts at least 1/per_second apart across threads."""
+
+    def __init__(self, per_second: float):
+        self._interval = 1 / per_second
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+# One pool and one spacer for every batched call (sync or async), so all
+# paths together stay under the per-key limit
+_batch_executor = ThreadPoolExecutor(
+    max_workers=MAX_CONCURRENT_REQUESTS, thread_name_prefix="easypost"
+)
+_batch_spacer = _RequestSpacer(REQUESTS_PER_SECOND)
+
+
+def _spaced_call(func, *args):
+    _batch_spacer.wait()
+    return func(*args)
+
+
+def submit_rate_limited(func, *args) -> Future:
+    """Run an EasyPost call on the shared, rate-limited worker pool."""
+    return _batch_executor.submit(_spaced_call, func, *args)
+
+
+def _log_unexpected_error(action: str, error: Exception) -> None:
+    """Log a non-API failure, with the traceback only at DEBUG.
+
+    The raised EasyPostError keeps the original exception for callers that
+    need more detail.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.exception("Unexpected error %s: %s", action, error)
+    else:
+        logger.error("Unexpected error %s: %s: %s", action, type(error).__name__, error)
+
+
+def _copy_tracking(tracking: dict) -> dict:
+    """Copy cached tracking info so callers cannot mutate the shared entry."""
+    return {**tracking, "events": [dict(event) for event in tracking["events"]]}
+
+
+def _format_location(location) -> str | None:
+    """Format a tracking event location as "City, ST"."""
+    if not location:
+        return None
+    return f"{location.city}, {location.state}"
+
+
 class EasyPostClient:
     """Wrapper around EasyPost API."""
 
+    # Shared across instances so connections (and their TLS sessions) are
+    # reused even though the API builds a client per request
+    session = _build_session()
+
+    # rate_id -> (shipment_id, quote fingerprint) for recent quotes, shared
+    # for the same reason
+    _rate_shipments: OrderedDict[str, tuple[str, tuple]] = OrderedDict()
+    _rate_shipments_lock = threading.Lock()
+
+    # Normalized address -> verified address
+    _address_cache = _TTLCache(ADDRESS_CACHE_SIZE)
+
+    # (api_key, normalized address) -> verified EasyPost address ID. IDs belong
+    # to an account, so unlike verification results they are keyed per API key.
+    _address_ids = _TTLCache(ADDRESS_CACHE_SIZE)
+
+    # (api_key, tracking_number, CARRIER) -> tracking info. Trackers are created
+    # under an account, so like address IDs they are keyed per API key.
+    _tracking_cache = _TTLCache(TRACKING_CACHE_SIZE)
+
     def __init__(self, api_key: str | None = None):
         key = api_key or os.getenv("EASYPOST_API_KEY")
         if not key:
             raise ValueError("EASYPOST_API_KEY not set")
         self.client = easypost.EasyPostClient(key)
+        if getattr(self.client, "_request_lib", None) == "requests":
+            self.client._requests_session = self.session
         self._load_from_address()
 
     def _load_from_address(self) -> None:
@@ -102,18 +323,74 @@ class EasyPostClient:
             zip_code=os.getenv("FROM_ZIP", ""),
             phone=os.getenv("FROM_PHONE", ""),
         )
+        # The SDK copies request params before sending, so one dict can be reused
+        self._default_from_dict = self.from_address.to_api_dict()
+
+    @classmethod
+    def _remember_rates(cls, rates: list[Rate], fingerprint: tuple) -> None:
+        """Record which shipment each quoted rate belongs to, and what it quoted."""
+        with cls._rate_shipments_lock:
+            for r in rates:
+                cls._rate_shipments[r.rate_id] = (r.shipment_id, fingerprint)
+                cls._rate_shipments.move_to_end(r.rate_id)
+            while len(cls._rate_shipments) > RATE_SHIPMENT_CACHE_SIZE:
+                cls._rate_shipments.popitem(last=False)
+
+    @classmethod
+    def _quoted_shipment_id(cls, rate_id: str, fingerprint: tuple) -> str | None:
+        """Return the shipment that quoted a rate, if it quoted this exact shipment."""
+        with cls._rate_shipments_lock:
+            entry = cls._rate_shipments.get(rate_id)
+        if entry is None or entry[1] != fingerprint:
+            return None
+        return entry[0]
+
+    @classmethod
+    def _forget_shipment(cls, shipment_id: str) -> None:
+        """Drop every rate of a bought shipment; it cannot be bought again."""
+        with cls._rate_shipments_lock:
+            for rate_id in [k for k, v in cls._rate_shipments.items() if v[0] == shipment_id]:
+                del cls._rate_shipments[rate_id]
+
+    def _quote_fingerprint(
+        self,
+        to_address: Address,
+        parcel: Parcel,
+        from_address: Address | None,
+    ) -> tuple:
+        """Identify what a quote was for: account, both addresses and the parcel."""
+        return (
+            self.client.api_key,
+            self._address_key(to_address),
+            self._address_key(from_address or self.from_address),
+            (parcel.length, parcel.width, parcel.height, parcel.weight),
+        )
 
-    def _address_to_dict(self, addr: Address) -> dict:
-        return {
-            "name": addr.name,
-            "street1": addr.street1,
-            "street2": addr.street2,
-            "city": addr.city,
-            "state": addr.state,
-            "zip": addr.zip_code,
-            "country": addr.country,
-            "phone": addr.phone,
-        }
+    @staticmethod
+    def _address_key(addr: Address) -> tuple:
+        """Normalize an address so trivially different spellings share a cache entry."""
+        return (
+            addr.name.strip().upper(),
+            addr.street1.strip().upper(),
+            addr.street2.strip().upper(),
+            addr.city.strip().upper(),
+            addr.state.strip().upper(),
+            addr.zip_code.split("-")[0].strip(),
+            addr.country.strip().upper(),
+            addr.phone.strip(),
+        )
+
+    def _address_payload(self, addr: Address) -> dict:
+        """Reference an already verified address by ID, else send it in full."""
+        address_id = self._address_ids.get((self.client.api_key, self._address_key(addr)))
+        if address_id:
+            return {"id": address_id}
+        return addr.to_api_dict()
+
+    def _from_address_dict(self, from_address: Address | None) -> dict:
+        if from_address is None:
+            return self._default_from_dict
+        return self._address_payload(from_address)
 
     def validate_address(self, address: Address) -> tuple[bool, Address | None, str]:
         """Validate an address.
@@ -121,14 +398,21 @@ class EasyPostClient:
         Args:
             address: Address to validate
 
+        Verified addresses are cached; invalid ones and errors are not.
+
         Returns:
             Tuple of (is_valid, corrected_address, message)
 
         Raises:
             AddressValidationError: If API call fails (not for invalid addresses)
         """
+        key = self._address_key(address)
+        cached = self._address_cache.get(key)
+        if cached is not None:
+            return True, cached, "Address is valid"
+
         try:
-            result = self.client.address.create_and_verify(**self._address_to_dict(address))
+            result = self.client.address.create_and_verify(**address.to_api_dict())
             corrected = Address(
                 name=result.name or address.name,
                 street1=result.street1,
@@ -139,16 +423,19 @@ class EasyPostClient:
                 country=result.country,
                 phone=result.phone or "",
             )
+            self._address_cache.set(key, corrected, ADDRESS_CACHE_TTL_SECONDS)
+            # Later shipments to either spelling can reference the verified record
+            for address_key in (key, self._address_key(corrected)):
+                self._address_ids.set((self.client.api_key, address_key), result.id, ADDRESS_CACHE_TTL_SECONDS)
             return True, corrected, "Address is valid"
         except easypost.errors.ApiError as e:
             # Address validation failures are expected - return as invalid
-            error_str = str(e)
             # Extract user-friendly message without internal details
-            if "E.ADDRESS" in error_str or "address" in error_str.lower():
+            if ADDRESS_ERROR_PATTERN.search(str(e)):
                 return False, None, "Address could not be verified. Please check the address and try again."
             return False, None, "Address validation failed. Please verify the address."
         except Exception as e:
-            logger.exception("Unexpected error validating address: %s", e)
+            _log_unexpected_error("validating address", e)
             raise AddressValidationError(
                 message="An error occurred while validating the address.",
                 code="EASYPOST_ADDRESS_ERROR",
@@ -174,12 +461,46 @@ class EasyPostClient:
         Raises:
             RateError: If unable to fetch rates from EasyPost
         """
-        from_addr = from_address or self.from_address
+        shipment = self._create_quote(to_address, parcel, from_address)
+        rates = self._to_rates(shipment.id, shipment.rates)
+
+        # Sort by price
+        rates.sort(key=attrgetter("rate"))
+        self._remember_rates(rates, self._quote_fingerprint(to_address, parcel, from_address))
+        return rates
+
+    def get_cheapest_rates(
+        self,
+        to_address: Address,
+        parcel: Parcel,
+        k: int = 3,
+        from_address: Address | None = None,
+    ) -> list[Rate]:
+        """Get only the k cheapest shipping rates for a parcel.
+
+        Same as get_rates()[:k] without converting and sorting every rate.
 
+        Raises:
+            RateError: If unable to fetch rates from EasyPost
+        """
+        shipment = self._create_quote(to_address, parcel, from_address)
+        # SDK rates are decimal strings, so compare them as numbers
+        cheapest = nsmallest(k, shipment.rates, key=lambda r: float(r.rate))
+        rates = self._to_rates(shipment.id, cheapest)
+        self._remember_rates(rates, self._quote_fingerprint(to_address, parcel, from_address))
+        return rates
+
+    def _create_quote(
+        self,
+        to_address: Address,
+        parcel: Parcel,
+        from_address: Address | None,
+    ):
+        """Create the EasyPost shipment that rates are quoted on."""
         try:
             shipment = self.client.shipment.create(
-                from_address=self._address_to_dict(from_addr),
-                to_address=self._address_to_dict(to_address),
+                from_address=self._from_address_dict(from_address),
+                to_address=self._address_payload(to_address),
                 parcel={
                     "length": parcel.length,
                     "width": parcel.width,
@@ -195,26 +516,27 @@ class EasyPostClient:
                 original_error=e,
             )
         except Exception as e:
-            logger.exception("Unexpected error fetching rates: %s", e)
+            _log_unexpected_error("fetching rates", e)
             raise RateError(
                 message="An error occurred while fetching shipping rates.",
                 code="EASYPOST_RATE_ERROR",
                 original_error=e,
             )
+        return shipment
 
-        rates = []
-        for r in shipment.rates:
-            rates.append(Rate(
+    @staticmethod
+    def _to_rates(shipment_id: str, sdk_rates) -> list[Rate]:
+        return [
+            Rate(
                 carrier=r.carrier,
                 service=r.service,
                 rate=float(r.rate),
                 delivery_days=r.delivery_days,
                 rate_id=r.id,
-            ))
-
-        # Sort by price
-        rates.sort(key=lambda x: x.rate)
-        return rates
+                shipment_id=shipment_id,
+            )
+            for r in sdk_rates
+        ]
 
     def create_shipment(
         self,
@@ -225,6 +547,9 @@ class EasyPostClient:
     ) -> Shipment:
         """Create a shipment and buy a label.
 
+        Buys on the shipment that quoted the rate when get_rates() quoted it
+        for the same addresses and parcel, otherwise creates a new shipment.
+
         Args:
             to_address: Destination address
             parcel: Package dimensions and weight
@@ -237,12 +562,26 @@ class EasyPostClient:
         Raises:
             ShipmentError: If unable to create shipment or purchase label
         """
-        from_addr = from_address or self.from_address
+        fingerprint = self._quote_fingerprint(to_address, parcel, from_address)
+        shipment_id = self._quoted_shipment_id(rate_id, fingerprint)
+        if shipment_id is None:
+            shipment_id = self._create_unquoted_shipment(to_address, parcel, from_address)
+
+        shipment = self._buy(shipment_id, rate_id)
+        self._forget_shipment(shipment_id)
+        return shipment
 
+    def _create_unquoted_shipment(
+        self,
+        to_address: Address,
+        parcel: Parcel,
+        from_address: Address | None,
+    ) -> str:
+        """Create a shipment for a rate that get_rates() did not quote here."""
         try:
             shipment = self.client.shipment.create(
-                from_address=self._address_to_dict(from_addr),
-                to_address=self._address_to_dict(to_address),
+                from_address=self._from_address_dict(from_address),
+                to_address=self._address_payload(to_address),
                 parcel={
                     "length": parcel.length,
                     "width": parcel.width,
@@ -258,16 +597,18 @@ class EasyPostClient:
                 original_error=e,
             )
         except Exception as e:
-            logger.exception("Unexpected error creating shipment: %s", e)
+            _log_unexpected_error("creating shipment", e)
             raise ShipmentError(
                 message="An error occurred while creating the shipment.",
                 code="EASYPOST_SHIPMENT_ERROR",
                 original_error=e,
             )
+        return shipment.id
 
-        # Buy the label with the selected rate
+    def _buy(self, shipment_id: str, rate_id: str) -> Shipment:
+        """Buy the label for a shipment with the selected rate."""
         try:
-            bought = self.client.shipment.buy(shipment.id, rate=rate_id)
+            bought = self.client.shipment.buy(shipment_id, rate={"id": rate_id})
         except easypost.errors.ApiError as e:
             logger.error("EasyPost API error purchasing label: %s", e)
             raise ShipmentError(
@@ -276,7 +617,7 @@ class EasyPostClient:
                 original_error=e,
             )
         except Exception as e:
-            logger.exception("Unexpected error purchasing label: %s", e)
+            _log_unexpected_error("purchasing label", e)
             raise ShipmentError(
                 message="An error occurred while purchasing the label.",
                 code="EASYPOST_SHIPMENT_ERROR",
@@ -299,12 +640,20 @@ class EasyPostClient:
             tracking_number: Tracking number from the carrier
             carrier: Carrier name (e.g., "USPS", "UPS", "FedEx")
 
+        Results are cached for TRACKING_CACHE_TTL_SECONDS, or
+        FINAL_TRACKING_CACHE_TTL_SECONDS once the status is final.
+
         Returns:
             Dictionary with status, estimated delivery, and tracking events
 
         Raises:
             TrackingError: If unable to fetch tracking information
         """
+        key = (self.client.api_key, tracking_number, carrier.upper())
+        cached = self._tracking_cache.get(key)
+        if cached is not None:
+            return _copy_tracking(cached)
+
         try:
             tracker = self.client.tracker.create(
                 tracking_code=tracking_number,
@@ -313,8 +662,7 @@ class EasyPostClient:
         except easypost.errors.ApiError as e:
             logger.error("EasyPost API error fetching tracking: %s", e)
             # Check if it's an invalid tracking number
-            error_str = str(e).lower()
-            if "not found" in error_str or "invalid" in error_str:
+            if TRACKING_NOT_FOUND_PATTERN.search(str(e)):
                 raise TrackingError(
                     message="Tracking number not found. Please verify the number is correct.",
                     code="EASYPOST_TRACKING_ERROR",
@@ -326,23 +674,61 @@ class EasyPostClient:
                 original_error=e,
             )
         except Exception as e:
-            logger.exception("Unexpected error fetching tracking: %s", e)
+            _log_unexpected_error("fetching tracking", e)
             raise TrackingError(
                 message="An error occurred while fetching tracking information.",
                 code="EASYPOST_TRACKING_ERROR",
                 original_error=e,
             )
 
-        return {
+        tracking = {
             "status": tracker.status,
             "estimated_delivery": tracker.est_delivery_date,
             "events": [
                 {
                     "status": e.status,
                     "message": e.message,
-                    "location": f"{e.tracking_location.city}, {e.tracking_location.state}" if e.tracking_location else None,
+                    "location": _format_location(e.tracking_location),
                     "datetime": e.datetime,
                 }
-                for e in (tracker.tracking_details or [])
+                for e in tracker.tracking_details or ()
             ],
         }
+        ttl = (
+            FINAL_TRACKING_CACHE_TTL_SECONDS
+            if tracker.status in FINAL_TRACKING_STATUSES
+            else TRACKING_CACHE_TTL_SECONDS
+        )
+        self._tracking_cache.set(key, tracking, ttl)
+        return _copy_tracking(tracking)
+
+    def invalidate_tracking(self, tracking_number: str, carrier: str) -> None:
+        """Drop cached tracking so the next get_tracking() fetches fresh data."""
+        self._tracking_cache.pop((self.client.api_key, tracking_number, carrier.upper()))
+
+    def _run_batch(self, func, calls: list[tuple]) -> list:
+        """Run func over argument tuples on the shared pool, in input order."""
+        futures = [submit_rate_limited(func, *args) for args in calls]
+        return [f.exception() or f.result() for f in futures]
+
+    def get_rates_many(
+        self,
+        quotes: list[tuple[Address, Parcel]],
+        from_address: Address | None = None,
+    ) -> list[list[Rate] | Exception]:
+        """Get rates for several parcels/destinations concurrently.
+
+        Returns:
+            One entry per request, in order: its rates, or the exception it raised
+        """
+        return self._run_batch(
+            self.get_rates, [(to_address, parcel, from_address) for to_address, parcel in quotes]
+        )
+
+    def get_tracking_many(self, trackers: list[tuple[str, str]]) -> list[dict | Exception]:
+        """Get tracking info for several (tracking_number, carrier) pairs concurrently.
+
+        Returns:
+            One entry per tracker, in order: its tracking info, or the exception it raised
+        """
+        return self._run_batch(self.get_tracking, trackers)
@@ -1,6 +1,7 @@
 """Mock implementations for testing without API keys."""
 
 import random
+import re
 from dataclasses import dataclass
 
 from src.easypost_client import Address, Parcel, Rate, Shipment
@@ -21,21 +22,37 @@ CARRIERS = [
     ("FedEx", "Priority Overnight", 1, 1),
 ]
 
+CARRIER_MARKUP = {"UPS": 1.1, "FedEx": 1.15}
+WEST_COAST = frozenset({"CA", "WA", "OR", "NV", "AZ"})
+EAST_COAST = frozenset({"NY", "NJ", "MA", "CT", "PA", "VA", "MD", "FL"})
 
-def _generate_rate_id() -> str:
-    return f"rate_{random.randint(10000, 99999)}"
+# (carrier, service, max_days, price multiplier) with the speed premium
+# (faster = more expensive) and carrier markup folded in. Every quote scales
+# the same multipliers, so sorting here keeps every result sorted by price.
+RATE_TABLE = tuple(sorted(
+    (
+        (carrier, service, max_days, (1 + 1.0 / min_days) * CARRIER_MARKUP.get(carrier, 1.0))
+        for carrier, service, min_days, max_days in CARRIERS
+    ),
+    key=lambda row: row[3],
+))
 
+RATE_ID_RANGE = range(10000, 100000)
 
-def _generate_tracking() -> str:
-    carriers = ["1Z", "94", "78"]
-    prefix = random.choice(carriers)
-    return f"{prefix}{random.randint(100000000, 999999999)}"
+
+TRACKING_PREFIXES = ("1Z", "94", "78")
+MOCK_CARRIERS = ("USPS", "UPS", "FedEx")
+
+
+def _generate_tracking(rng: random.Random | None = None) -> str:
+    rng = rng or random
+    return f"{rng.choice(TRACKING_PREFIXES)}{rng.randint(100000000, 999999999)}"
 
 
 class MockEasyPostClient:
     """Mock EasyPost client for testing."""
 
-    def __init__(self, api_key: str | None = None):
+    def __init__(self, api_key: str | None = None, seed: int | None = None):
         # Accept but ignore api_key
         self.from_address = Address(
             name="Test Shipper",
@@ -45,6 +62,9 @@ class MockEasyPostClient:
             zip_code="10001",
             phone="5551234567",
         )
+        # Own generator, so concurrent clients don't share the module-level
+        # state and a seed makes a client's output reproducible
+        self._rng = random.Random(seed)
 
     def validate_address(self, address: Address) -> tuple[bool, Address | None, str]:
         """Mock address validation - always succeeds with standardized format."""
@@ -72,38 +92,36 @@ class MockEasyPostClient:
         base_cost = 5.0 + (weight_factor * 0.5)
 
         # Simulate distance factor based on state
-        west_coast = ["CA", "WA", "OR", "NV", "AZ"]
-        east_coast = ["NY", "NJ", "MA", "CT", "PA", "VA", "MD", "FL"]
-
-        if to_address.state.upper() in west_coast:
+        state = to_address.state.upper()
+        if state in WEST_COAST:
             distance_factor = 1.5
-        elif to_address.state.upper() in east_coast:
+        elif state in EAST_COAST:
             distance_factor = 1.0
         else:
             distance_factor = 1.25
 
-        rates = []
-        for carrier, service, min_days, max_days in CARRIERS:
-            # Faster = more expensive
-            speed_factor = 1.0 / min_days
-            rate = base_cost * distance_factor * (1 + speed_factor)
-
-            # Add carrier variation
-            if carrier == "UPS":
-                rate *= 1.1
-            elif carrier == "FedEx":
-                rate *= 1.15
-
-            rates.append(Rate(
+        scale = base_cost * distance_factor
+        rate_ids = self._rng.choices(RATE_ID_RANGE, k=len(RATE_TABLE))
+        return [
+            Rate(
                 carrier=carrier,
                 service=service,
-                rate=round(rate, 2),
+                rate=round(scale * multiplier, 2),
                 delivery_days=max_days,
-                rate_id=_generate_rate_id(),
-            ))
+                rate_id=f"rate_{rate_id}",
+            )
+            for (carrier, service, max_days, multiplier), rate_id in zip(RATE_TABLE, rate_ids)
+        ]
 
-        rates.sort(key=lambda x: x.rate)
-        return rates
+    def get_cheapest_rates(
+        self,
+        to_address: Address,
+        parcel: Parcel,
+        k: int = 3,
+        from_address: Address | None = None,
+    ) -> list[Rate]:
+        """Return the k cheapest mock rates."""
+        return self.get_rates(to_address, parcel, from_address)[:k]
 
     def create_shipment(
         self,
@@ -114,16 +132,16 @@ class MockEasyPostClient:
     ) -> Shipment:
         """Create a mock shipment."""
         # Find a carrier based on rate_id pattern (in real impl, we'd look this up)
-        carrier = random.choice(["USPS", "UPS", "FedEx"])
+        carrier = self._rng.choice(MOCK_CARRIERS)
         service = "Ground"
 
         return Shipment(
-            id=f"shp_{random.randint(10000, 99999)}",
-            tracking_number=_generate_tracking(),
+            id=f"shp_{self._rng.randint(10000, 99999)}",
+            tracking_number=_generate_tracking(self._rng),
             label_url="https://example.com/labels/mock-label.pdf",
             carrier=carrier,
             service=service,
-            rate=round(random.uniform(8, 25), 2),
+            rate=round(self._rng.uniform(8, 25), 2),
         )
 
     def get_tracking(self, tracking_number: str, carrier: str) -> dict:
@@ -185,15 +203,24 @@ What would you like to do?""",
 }
 
 
+# Response keywords, checked in priority order (a "rate" match wins over "valid")
+MOCK_RESPONSE_KEYWORDS = (
+    ("rates", ("rate", "cost", "price", "ship to", "how much")),
+    ("validate", ("valid", "check address", "verify")),
+    ("ship", ("ship it", "create", "buy", "purchase", "use the")),
+)
+# One alternation per category scans the input once instead of once per keyword
+_MOCK_RESPONSE_PATTERNS = tuple(
+    (category, re.compile("|".join(map(re.escape, keywords))))
+    for category, keywords in MOCK_RESPONSE_KEYWORDS
+)
+
+
 def get_mock_response(user_input: str) -> str:
     """Return a mock response based on user input keywords."""
     lower = user_input.lower()
 
-    if any(word in lower for word in ["rate", "cost", "price", "ship to", "how much"]):
-        return MOCK_RESPONSES["rates"]
-    elif any(word in lower for word in ["valid", "check address", "verify"]):
-        return MOCK_RESPONSES["validate"]
-    elif any(word in lower for word in ["ship it", "create", "buy", "purchase", "use the"]):
-        return MOCK_RESPONSES["ship"]
-    else:
-        return MOCK_RESPONSES["default"]
+    for category, pattern in _MOCK_RESPONSE_PATTERNS:
+        if pattern.search(lower):
+            return MOCK_RESPONSES[category]
+    return MOCK_RESPONSES["default"]
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -16,6 +17,9 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on pooled Redis connections shared by all requests
+REDIS_MAX_CONNECTIONS = 64
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -25,6 +29,7 @@ async def lifespan(app: FastAPI):
     from src.db.seed import seed_demo_data, has_demo_data
     from src.db.database import get_db_session
     from src.api.chat import agents
+    from src.auth.shopify import close_http_client
 
     logger.info("Running database migrations...")
     try:
@@ -40,6 +45,16 @@ async def lifespan(app: FastAPI):
                 seed_demo_data(db)
                 logger.info("Demo data seeded")
 
+    # Shared Redis client for caches (optional, enabled by REDIS_URL)
+    app.state.redis = None
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        from redis.asyncio import BlockingConnectionPool, Redis
+
+        pool = BlockingConnectionPool.from_url(redis_url, max_connections=REDIS_MAX_CONNECTIONS)
+        app.state.redis = Redis(connection_pool=pool)
+        logger.info("Redis cache enabled (max %d connections)", REDIS_MAX_CONNECTIONS)
+
     mode = "MOCK" if is_mock_mode() else "LIVE"
     print(f"\n  Shipping Agent Server ({mode} MODE)")
     print(f"  http://localhost:8000\n")
@@ -47,6 +62,9 @@ async def lifespan(app: FastAPI):
     yield
 
     agents.clear()
+    await close_http_client()
+    if app.state.redis is not None:
+        await app.state.redis.aclose(close_connection_pool=True)
 
 
 app = FastAPI(
@@ -117,6 +135,8 @@ async def index():
 def main():
     """Run the server."""
     import uvicorn
+    # loop/http default to "auto", which picks uvloop and httptools
+    # (installed via uvicorn[standard]) and falls back to asyncio/h11.
     uvicorn.run(
         "src.server:app",
         host="0.0.0.0",
@@ -29,9 +29,14 @@ def setup_test_database():
     # Cleanup after all tests
     Base.metadata.drop_all(bind=engine)
     engine.dispose()
-    # Remove the test database file
+    # The app engine may hold WAL-mode connections to the same file; close
+    # them so the -wal/-shm sidecars can be removed with it
+    from src.db.database import engine as app_engine
+    app_engine.dispose()
+
     import pathlib
-    pathlib.Path("test_integration.db").unlink(missing_ok=True)
+    for suffix in ("", "-wal", "-shm"):
+        pathlib.Path(f"test_integration.db{suffix}").unlink(missing_ok=True)
 
 
 @pytest.fixture(scope="function")
@@ -20,6 +20,10 @@ class TestHealthEndpoint:
         assert "mock_mode" in data
         assert data["mock_mode"] is True  # Tests run in mock mode
 
+    def test_redis_disabled_without_url(self, test_client):
+        """Test that no Redis client is created when REDIS_URL is unset."""
+        assert test_client.app.state.redis is None
+
 
 class TestCustomerEndpoints:
     """Tests for customer-related endpoints."""
@@ -343,6 +347,14 @@ class TestShipmentEndpoints:
         data = response.json()
         assert data["id"] == shipment_id
 
+    def test_get_shipment_invalid_id(self, test_client, sample_customer, auth_headers):
+        """Test that a malformed shipment ID is rejected before the handler runs."""
+        response = test_client.get("/api/shipments/not-a-uuid", headers=auth_headers)
+        assert response.status_code == 422
+
+        response = test_client.get("/api/shipments/not-a-uuid/tracking", headers=auth_headers)
+        assert response.status_code == 422
+
     def test_get_shipment_tracking(self, test_client, sample_customer, auth_headers):
         """Test getting shipment tracking."""
         # Create a shipment first
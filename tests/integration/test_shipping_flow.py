@@ -2,6 +2,7 @@
 
 import pytest
 import re
+from unittest.mock import AsyncMock, patch
 
 
 class TestRateRetrieval:
@@ -396,6 +397,39 @@ class TestOrderFulfillment:
         assert order_response.status_code == 200
         assert order_response.json()["status"] in ["shipped", "fulfilled"]
 
+    def test_shipment_schedules_shopify_fulfillment(
+        self, test_client, sample_orders, sample_customer, customer_repo, auth_headers
+    ):
+        """Test that Shopify fulfillment is handed off to a background task."""
+        order = sample_orders[1]
+        customer_repo.update(sample_customer.id, {"shopify_access_token": "encrypted-token"})
+
+        with patch(
+            "src.api.shipping._create_shopify_fulfillment", new_callable=AsyncMock
+        ) as mock_fulfillment:
+            response = test_client.post(
+                "/api/shipments",
+                json={
+                    "order_id": str(order.id),
+                    "rate_id": "rate_12345",
+                    "to_name": "Bob Smith",
+                    "to_street": "456 Oak Avenue",
+                    "to_city": "Chicago",
+                    "to_state": "IL",
+                    "to_zip": "60601",
+                    "weight_oz": 16,
+                },
+                headers=auth_headers,
+            )
+
+        assert response.status_code == 200
+        mock_fulfillment.assert_awaited_once()
+        kwargs = mock_fulfillment.call_args.kwargs
+        assert kwargs["shopify_order_id"] == "SHOP-1002"
+        assert kwargs["encrypted_access_token"] == "encrypted-token"
+        assert kwargs["shop_domain"] == sample_customer.shop_domain
+        assert kwargs["tracking_number"] == response.json()["tracking_number"]
+
     def test_cannot_ship_already_shipped_order(self, test_client, sample_orders, auth_headers):
         """Test that already shipped orders cannot be re-shipped."""
         shipped_order = sample_orders[2]  # Already shipped
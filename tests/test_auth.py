@@ -5,6 +5,7 @@ import pytest
 import hmac
 import hashlib
 import base64
+import json
 from datetime import datetime, timedelta, timezone
 from unittest.mock import patch, AsyncMock, MagicMock
 
@@ -91,7 +92,9 @@ class TestJWT:
 
         assert session is not None
         # Expiration should be ~1 hour from now
-        time_diff = session.exp - datetime.now(timezone.utc)
+        assert isinstance(session.exp, int)
+        assert session.exp - session.iat == 3600
+        time_diff = session.expires_at - datetime.now(timezone.utc)
         assert timedelta(minutes=55) < time_diff < timedelta(hours=1, minutes=5)
 
     def test_verify_invalid_token(self):
@@ -156,6 +159,11 @@ class TestShopifyOAuth:
         assert ShopifyOAuth.validate_shop_domain("myshopify.com") is False
         assert ShopifyOAuth.validate_shop_domain("-invalid.myshopify.com") is False
         assert ShopifyOAuth.validate_shop_domain("test.otherdomain.com") is False
+        assert ShopifyOAuth.validate_shop_domain("a.b.myshopify.com") is False
+        assert ShopifyOAuth.validate_shop_domain("tést.myshopify.com") is False
+        assert ShopifyOAuth.validate_shop_domain("test.myshopify.com\n") is False
+        assert ShopifyOAuth.validate_shop_domain("a" * 63 + ".myshopify.com") is True
+        assert ShopifyOAuth.validate_shop_domain("a" * 64 + ".myshopify.com") is False
 
     def test_generate_nonce(self):
         """Test nonce generation."""
@@ -187,6 +195,16 @@ class TestShopifyOAuth:
         assert "redirect_uri=" in url
         assert "scope=" in url
 
+        # Same URL the plain urlencode of all params would give
+        from urllib.parse import urlencode
+        expected = "https://test-store.myshopify.com/admin/oauth/authorize?" + urlencode({
+            "client_id": oauth.config.api_key,
+            "scope": oauth.config.scopes,
+            "redirect_uri": f"{oauth.config.app_url}/auth/shopify/callback",
+            "state": nonce,
+        })
+        assert url == expected
+
     def test_authorization_url_invalid_shop(self):
         """Test that invalid shop domain raises error."""
         from src.auth.shopify import ShopifyOAuth
@@ -216,11 +234,23 @@ class TestShopifyOAuth:
 
         params["hmac"] = valid_hmac
 
+        assert verify_hmac(params, secret) is True
+        assert verify_hmac(params, secret.encode()) is True
+
+        # List values (from parse_qs) use their first element
+        list_params = {k: [v] for k, v in params.items() if k != "hmac"}
+        list_params["hmac"] = valid_hmac
+        assert verify_hmac(list_params, secret) is True
+
+        # Hex case doesn't matter once decoded
+        params["hmac"] = valid_hmac.upper()
         assert verify_hmac(params, secret) is True
 
         # Invalid HMAC
         params["hmac"] = "invalid-hmac"
         assert verify_hmac(params, secret) is False
+        params["hmac"] = "00" * 32
+        assert verify_hmac(params, secret) is False
 
         # Missing HMAC
         del params["hmac"]
@@ -239,8 +269,33 @@ class TestShopifyOAuth:
         ).decode()
 
         assert verify_webhook_hmac(body, valid_hmac, secret) is True
+        assert verify_webhook_hmac(body, valid_hmac, secret.encode()) is True
         assert verify_webhook_hmac(body, "invalid", secret) is False
         assert verify_webhook_hmac(body, "", secret) is False
+        assert verify_webhook_hmac(body, "ínválid", secret) is False
+        assert verify_webhook_hmac(body, valid_hmac.rstrip("="), secret) is False
+        assert verify_webhook_hmac(b"tampered" + body, valid_hmac, secret) is False
+
+    def test_parse_shop_from_host(self):
+        """Test decoding the shop domain from the host parameter."""
+        from src.auth.shopify import parse_shop_from_host
+
+        def encode(value: str) -> str:
+            return base64.b64encode(value.encode()).decode()
+
+        assert parse_shop_from_host(encode("test.myshopify.com/admin")) == "test.myshopify.com"
+        assert parse_shop_from_host(encode("test.myshopify.com")) == "test.myshopify.com"
+        # Unpadded host values decode the same
+        assert encode("shop1.myshopify.com/admin").endswith("==")
+        assert parse_shop_from_host(encode("shop1.myshopify.com/admin").rstrip("=")) == "shop1.myshopify.com"
+        # Long trailing path doesn't need decoding
+        assert parse_shop_from_host(encode("test.myshopify.com/admin" + "/x" * 200)) == "test.myshopify.com"
+        longest_shop = "a" * 63 + ".myshopify.com"
+        assert parse_shop_from_host(encode(longest_shop + "/admin")) == longest_shop
+        assert parse_shop_from_host(encode("a" * 120 + ".myshopify.com/admin")) is None
+
+        assert parse_shop_from_host(encode("evil.com/admin")) is None
+        assert parse_shop_from_host("not base64!") is None
 
     @pytest.mark.asyncio
     async def test_exchange_code_for_token(self):
@@ -250,19 +305,17 @@ class TestShopifyOAuth:
 
         oauth = ShopifyOAuth()
 
-        # Mock the httpx response - use MagicMock for sync json()
+        # Mock the httpx response body
         mock_response = MagicMock()
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "access_token": "shpat_test_token",
             "scope": "read_orders,write_fulfillments",
-        }
+        }).encode()
         mock_response.raise_for_status = MagicMock()
 
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch("src.auth.shopify.get_http_client") as mock_client:
             mock_instance = AsyncMock()
             mock_instance.post.return_value = mock_response
-            mock_instance.__aenter__.return_value = mock_instance
-            mock_instance.__aexit__.return_value = None
             mock_client.return_value = mock_instance
 
             result = await oauth.exchange_code_for_token("test.myshopify.com", "auth-code")
@@ -304,6 +357,7 @@ class TestIntegrationAuth:
     def setup_database(self):
         """Set up test database once for all tests in this class."""
         os.environ["MOCK_MODE"] = "1"
+        previous_url = os.environ.get("DATABASE_URL")
         os.environ["DATABASE_URL"] = "sqlite:///./test_auth.db"
 
         from sqlalchemy import create_engine
@@ -318,9 +372,16 @@ class TestIntegrationAuth:
         yield engine
         Base.metadata.drop_all(bind=engine)
         engine.dispose()
+        from src.db.database import engine as app_engine
+        app_engine.dispose()
 
         import pathlib
-        pathlib.Path("test_auth.db").unlink(missing_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            pathlib.Path(f"test_auth.db{suffix}").unlink(missing_ok=True)
+        if previous_url is None:
+            os.environ.pop("DATABASE_URL", None)
+        else:
+            os.environ["DATABASE_URL"] = previous_url
 
     @pytest.fixture
     def test_client(self, setup_database):
@@ -442,10 +503,20 @@ class TestIntegrationAuth:
 class TestTokenValidation:
     """Tests for Shopify token validation."""
 
+    @pytest.fixture(autouse=True)
+    def clear_token_cache(self):
+        """Keep cached token verdicts from leaking between tests."""
+        from src.auth import shopify
+
+        shopify._token_validation_cache.clear()
+        yield
+        shopify._token_validation_cache.clear()
+
     @pytest.fixture(scope="class")
     def setup_database(self):
         """Set up test database once for all tests in this class."""
         os.environ["MOCK_MODE"] = "1"
+        previous_url = os.environ.get("DATABASE_URL")
         os.environ["DATABASE_URL"] = "sqlite:///./test_token_validation.db"
 
         from sqlalchemy import create_engine
@@ -460,9 +531,16 @@ class TestTokenValidation:
         yield engine
         Base.metadata.drop_all(bind=engine)
         engine.dispose()
+        from src.db.database import engine as app_engine
+        app_engine.dispose()
 
         import pathlib
-        pathlib.Path("test_token_validation.db").unlink(missing_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            pathlib.Path(f"test_token_validation.db{suffix}").unlink(missing_ok=True)
+        if previous_url is None:
+            os.environ.pop("DATABASE_URL", None)
+        else:
+            os.environ["DATABASE_URL"] = previous_url
 
     @pytest.fixture
     def test_client(self, setup_database):
@@ -496,14 +574,12 @@ class TestTokenValidation:
         from src.auth.shopify import validate_access_token
 
         # Mock httpx response for valid token
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch("src.auth.shopify.get_http_client") as mock_client:
             mock_response = MagicMock()
             mock_response.status_code = 200
 
             mock_instance = AsyncMock()
-            mock_instance.get.return_value = mock_response
-            mock_instance.__aenter__.return_value = mock_instance
-            mock_instance.__aexit__.return_value = None
+            mock_instance.head.return_value = mock_response
             mock_client.return_value = mock_instance
 
             result = await validate_access_token(
@@ -518,14 +594,12 @@ class TestTokenValidation:
         from src.auth.shopify import validate_access_token
 
         # Mock httpx response for invalid token
-        with patch("httpx.AsyncClient") as mock_client:
+        with patch("src.auth.shopify.get_http_client") as mock_client:
             mock_response = MagicMock()
             mock_response.status_code = 401  # Unauthorized
 
             mock_instance = AsyncMock()
-            mock_instance.get.return_value = mock_response
-            mock_instance.__aenter__.return_value = mock_instance
-            mock_instance.__aexit__.return_value = None
+            mock_instance.head.return_value = mock_response
             mock_client.return_value = mock_instance
 
             result = await validate_access_token(
@@ -534,6 +608,44 @@ class TestTokenValidation:
             )
             assert result is False
 
+    @pytest.mark.asyncio
+    async def test_validate_access_token_falls_back_to_get(self):
+        """Test that a 405 on HEAD retries with a trimmed GET."""
+        from src.auth import shopify
+
+        with patch("src.auth.shopify.get_http_client") as mock_client:
+            mock_instance = AsyncMock()
+            mock_instance.head.return_value = MagicMock(status_code=405)
+            mock_instance.get.return_value = MagicMock(status_code=200)
+            mock_client.return_value = mock_instance
+
+            assert await shopify.validate_access_token(
+                "head-fallback.myshopify.com", "shpat_valid_token"
+            ) is True
+            assert mock_instance.get.call_args.kwargs["params"] == {"fields": "id"}
+
+    @pytest.mark.asyncio
+    async def test_validate_access_tokens_bulk(self):
+        """Test that bulk validation keeps input order and skips bad domains."""
+        from src.auth import shopify
+
+        async def head(url, **kwargs):
+            revoked = kwargs["headers"]["X-Shopify-Access-Token"] == "shpat_revoked"
+            return MagicMock(status_code=401 if revoked else 200)
+
+        with patch("src.auth.shopify.get_http_client") as mock_client:
+            mock_instance = AsyncMock()
+            mock_instance.head.side_effect = head
+            mock_client.return_value = mock_instance
+
+            results = await shopify.validate_access_tokens_bulk([
+                ("bulk-a.myshopify.com", "shpat_ok"),
+                ("bulk-b.myshopify.com", "shpat_revoked"),
+                ("not-a-shop.com", "shpat_ok"),
+            ])
+            assert results == [True, False, False]
+            assert mock_instance.head.call_count == 2
+
     @pytest.mark.asyncio
     async def test_validate_access_token_empty_inputs(self):
         """Test validate_access_token with empty inputs."""
@@ -553,6 +665,32 @@ class TestTokenValidation:
         result = await validate_access_token("not-a-shopify-domain.com", "token")
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_validate_access_token_caches_verdict(self):
+        """Test that a definite verdict is reused, and unknown ones are not."""
+        import asyncio
+        from src.auth import shopify
+
+        with patch("src.auth.shopify.get_http_client") as mock_client:
+            mock_instance = AsyncMock()
+            mock_instance.head.return_value = MagicMock(status_code=401)
+            mock_client.return_value = mock_instance
+
+            shop = "cache-test.myshopify.com"
+            results = await asyncio.gather(
+                shopify.validate_access_token(shop, "shpat_revoked"),
+                shopify.validate_access_token(shop, "shpat_revoked"),
+            )
+            assert results == [False, False]
+            assert await shopify.validate_access_token(shop, "shpat_revoked") is False
+            assert mock_instance.head.call_count == 1
+
+            # 5xx can't be judged: assume valid, but ask again next time
+            mock_instance.head.return_value = MagicMock(status_code=503)
+            assert await shopify.validate_access_token(shop, "shpat_other") is True
+            assert await shopify.validate_access_token(shop, "shpat_other") is True
+            assert mock_instance.head.call_count == 3
+
     def test_invalid_token_blocks_api_access(self, test_client, setup_database):
         """Test that customers with invalid tokens are blocked."""
         from sqlalchemy.orm import sessionmaker
@@ -569,7 +707,7 @@ class TestTokenValidation:
             "shop_domain": "invalid-token-test.myshopify.com",
             "name": "Invalid Token Store",
             "email": "test@test.com",
-            "token_invalid": 1,  # Mark as invalid
+            "token_invalid": True,  # Mark as invalid
         })
         db.commit()
         customer_id = str(customer.id)
@@ -603,7 +741,7 @@ class TestTokenValidation:
             "shop_domain": "reconnect-test.myshopify.com",
             "name": "Reconnect Test Store",
             "email": "test@test.com",
-            "token_invalid": 1,
+            "token_invalid": True,
             "shopify_nonce": "test-nonce-123",  # Set nonce for OAuth callback
         })
         db.commit()
@@ -639,7 +777,7 @@ class TestTokenValidation:
             "shop_domain": "reconnect-redirect.myshopify.com",
             "name": "Reconnect Redirect Store",
             "email": "test@test.com",
-            "token_invalid": 1,
+            "token_invalid": True,
         })
         db.commit()
         customer_id = str(customer.id)
@@ -675,14 +813,14 @@ class TestTokenValidation:
         db.commit()
 
         # Initially should be valid (0)
-        assert customer.token_invalid == 0
+        assert customer.token_invalid is False
 
         # Mark as invalid
         customer_repo.mark_token_invalid(customer.id)
 
         # Refresh and check
         db.refresh(customer)
-        assert customer.token_invalid == 1
+        assert customer.token_invalid is True
         db.close()
 
     def test_repository_mark_token_valid(self, setup_database):
@@ -701,7 +839,7 @@ class TestTokenValidation:
             "shop_domain": "mark-valid-test.myshopify.com",
             "name": "Mark Valid Test",
             "email": "test@test.com",
-            "token_invalid": 1,
+            "token_invalid": True,
         })
         db.commit()
 
@@ -710,6 +848,6 @@ class TestTokenValidation:
 
         # Refresh and check
         db.refresh(customer)
-        assert customer.token_invalid == 0
+        assert customer.token_invalid is False
         assert customer.token_validated_at is not None
         db.close()
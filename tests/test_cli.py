@@ -0,0 +1,72 @@
+"""Tests for CLI startup."""
+
+import os
+
+import pytest
+
+from src import cli
+
+
+class TestStartupStamp:
+    """Tests for skipping database setup on repeat starts."""
+
+    @pytest.fixture
+    def prepared(self, tmp_path, monkeypatch):
+        """Point the CLI at a scratch database and record each full setup."""
+        db_path = tmp_path / "agent.db"
+        db_path.touch()
+        migrations = tmp_path / "versions"
+        migrations.mkdir()
+        (migrations / "001_initial.py").touch()
+
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_path}")
+        monkeypatch.setattr(cli, "STARTUP_STAMP_PATH", tmp_path / "cache" / "db.stamp")
+        monkeypatch.setattr(cli, "MIGRATIONS_DIR", migrations)
+        monkeypatch.setattr("src.db.migrations.get_head_revision", lambda: "001")
+        monkeypatch.setattr("src.db.migrations.get_current_revision", lambda: "001")
+        monkeypatch.setattr("src.db.seed.get_demo_customer", lambda db: None)
+
+        calls = []
+        monkeypatch.setattr(cli, "_prepare_database", lambda db: calls.append(db) or True)
+        return calls
+
+    def test_matching_stamp_skips_setup(self, prepared):
+        cli.setup_database(None)
+        cli.setup_database(None)
+
+        assert len(prepared) == 1
+
+    def test_replaced_database_file_runs_setup(self, prepared, tmp_path):
+        cli.setup_database(None)
+
+        # Create the replacement while the original exists so it gets a new inode
+        replacement = tmp_path / "replacement.db"
+        replacement.touch()
+        os.replace(replacement, tmp_path / "agent.db")
+        cli.setup_database(None)
+
+        assert len(prepared) == 2
+
+    def test_new_migration_runs_setup(self, prepared, tmp_path):
+        cli.setup_database(None)
+
+        (tmp_path / "versions" / "002_next.py").touch()
+        cli.setup_database(None)
+
+        assert len(prepared) == 2
+
+    def test_changed_revision_runs_setup(self, prepared, monkeypatch):
+        cli.setup_database(None)
+
+        monkeypatch.setattr("src.db.migrations.get_current_revision", lambda: None)
+        cli.setup_database(None)
+
+        assert len(prepared) == 2
+
+    def test_failed_migration_is_not_stamped(self, prepared, monkeypatch):
+        monkeypatch.setattr(cli, "_prepare_database", lambda db: prepared.append(db) and False)
+
+        cli.setup_database(None)
+        cli.setup_database(None)
+
+        assert len(prepared) == 2
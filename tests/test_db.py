@@ -143,6 +143,30 @@ class TestCustomerRepository:
         found = customer_repo.get_by_id(sample_customer.id)
         assert found.labels_this_month == initial_count + 5
 
+    def test_try_consume_label(self, customer_repo, sample_customer):
+        """Test consuming a label under the limit."""
+        count = customer_repo.try_consume_label(sample_customer.id)
+        assert count == 11
+
+        found = customer_repo.get_by_id(sample_customer.id)
+        assert found.labels_this_month == 11
+
+    def test_try_consume_label_at_limit(self, customer_repo, sample_customer):
+        """Test that consuming a label at the limit is refused."""
+        customer_repo.update_label_count(sample_customer.id, 500)
+
+        assert customer_repo.try_consume_label(sample_customer.id) is None
+        found = customer_repo.get_by_id(sample_customer.id)
+        assert found.labels_this_month == 500
+
+    def test_release_label(self, customer_repo, sample_customer):
+        """Test giving back a consumed label."""
+        customer_repo.try_consume_label(sample_customer.id)
+        customer_repo.release_label(sample_customer.id)
+
+        found = customer_repo.get_by_id(sample_customer.id)
+        assert found.labels_this_month == 10
+
 
 class TestOrderRepository:
     """Tests for OrderRepository."""
@@ -167,6 +191,18 @@ class TestOrderRepository:
         assert found is not None
         assert found.recipient_name == "John Doe"
 
+    def test_get_for_customer(self, order_repo, customer_repo, sample_customer, sample_order):
+        """Test getting an order scoped to its owning customer."""
+        found = order_repo.get_for_customer(sample_order.id, sample_customer.id)
+        assert found is not None
+        assert found.id == sample_order.id
+
+        other = customer_repo.create({
+            "shop_domain": "other-store.myshopify.com",
+            "name": "Other Store",
+        })
+        assert order_repo.get_for_customer(sample_order.id, other.id) is None
+
     def test_get_by_shopify_id(self, order_repo, sample_customer, sample_order):
         """Test getting order by Shopify order ID."""
         found = order_repo.get_by_shopify_id(sample_customer.id, "ORDER-123")
@@ -239,6 +275,92 @@ class TestOrderRepository:
         found = order_repo.get_by_id(sample_order.id)
         assert found.status == "shipped"
 
+    def test_upsert_creates_new_order(self, order_repo, sample_customer):
+        """Test upsert inserts an order that doesn't exist yet."""
+        order_repo.upsert_by_shopify_id({
+            "customer_id": sample_customer.id,
+            "shopify_order_id": "ORDER-NEW",
+            "order_number": "#2001",
+            "recipient_name": "New Customer",
+            "status": "unfulfilled",
+            "line_items": [{"title": "Widget", "quantity": 1}],
+        })
+
+        found = order_repo.get_by_shopify_id(sample_customer.id, "ORDER-NEW")
+        assert found is not None
+        assert found.id is not None
+        assert found.recipient_name == "New Customer"
+        assert found.line_items == [{"title": "Widget", "quantity": 1}]
+
+    def test_upsert_updates_existing_order(self, order_repo, sample_customer, sample_order):
+        """Test upsert updates an existing order in place."""
+        order_repo.upsert_by_shopify_id({
+            "customer_id": sample_customer.id,
+            "shopify_order_id": "ORDER-123",
+            "order_number": "#1001",
+            "recipient_name": "John Q. Doe",
+            "status": "fulfilled",
+        })
+
+        order_repo.db.expire_all()
+        found = order_repo.get_by_shopify_id(sample_customer.id, "ORDER-123")
+        assert found.id == sample_order.id
+        assert found.recipient_name == "John Q. Doe"
+        assert found.status == "fulfilled"
+        assert len(order_repo.list_by_customer(sample_customer.id)) == 1
+
+    def test_update_fields(self, order_repo, sample_customer, sample_order):
+        """Test updating order columns while keeping the Shopify key."""
+        order_repo.update_fields(sample_order.id, {
+            "customer_id": sample_customer.id,
+            "shopify_order_id": "IGNORED",
+            "recipient_name": "Jane Doe",
+            "weight_oz": 24.0,
+        })
+
+        found = order_repo.get_by_id(sample_order.id)
+        assert found.recipient_name == "Jane Doe"
+        assert found.weight_oz == 24.0
+        assert found.shopify_order_id == "ORDER-123"
+
+    def test_iter_by_customer(self, order_repo, sample_customer):
+        """Test streaming orders in small chunks."""
+        order_repo.bulk_create(
+            {
+                "customer_id": sample_customer.id,
+                "shopify_order_id": f"STREAM-{i}",
+                "order_number": f"#{i}",
+                "recipient_name": f"Customer {i}",
+                "status": "shipped" if i % 2 else "unfulfilled",
+            }
+            for i in range(7)
+        )
+
+        assert len(list(order_repo.iter_by_customer(sample_customer.id, chunk_size=2))) == 7
+        shipped = list(order_repo.iter_by_customer(sample_customer.id, status="shipped", chunk_size=2))
+        assert {order.shopify_order_id for order in shipped} == {"STREAM-1", "STREAM-3", "STREAM-5"}
+
+    def test_bulk_create(self, order_repo, sample_customer, monkeypatch):
+        """Test inserting orders in chunks with defaults applied."""
+        monkeypatch.setattr("src.db.repository.BULK_INSERT_CHUNK_SIZE", 2)
+        rows = (
+            {
+                "customer_id": sample_customer.id,
+                "shopify_order_id": f"BULK-{i}",
+                "order_number": f"#{i}",
+                "recipient_name": f"Customer {i}",
+                "status": "unfulfilled",
+            }
+            for i in range(5)
+        )
+
+        assert order_repo.bulk_create(rows) == 5
+        assert order_repo.bulk_create([]) == 0
+
+        orders = order_repo.list_by_customer(sample_customer.id)
+        assert len(orders) == 5
+        assert all(order.id is not None and order.created_at is not None for order in orders)
+
     def test_list_unfulfilled_with_limit(self, order_repo, sample_customer):
         """Test limiting unfulfilled orders."""
         for i in range(5):
@@ -315,6 +437,27 @@ class TestShipmentRepository:
         shipments = shipment_repo.list_by_customer(sample_customer.id)
         assert len(shipments) == 3
 
+    def test_add_tracking_events(self, shipment_repo, sample_customer):
+        """Test inserting a webhook's tracking events in one batch."""
+        shipment = shipment_repo.create({
+            "customer_id": sample_customer.id,
+            "carrier": "USPS",
+            "service": "Priority",
+            "tracking_number": "9400111899223385748699",
+        })
+
+        ids = shipment_repo.add_tracking_events(shipment.id, [
+            {"status": "pre_transit", "description": "Label created"},
+            {"status": "in_transit", "location": {"city": "Austin", "state": "TX"}},
+            {"status": "delivered", "occurred_at": datetime(2026, 1, 2, 15, 30)},
+        ])
+        assert shipment_repo.add_tracking_events(shipment.id, []) == []
+
+        events = {event.id: event for event in shipment_repo.get_by_id(shipment.id).tracking_events}
+        assert [events[i].status for i in ids] == ["pre_transit", "in_transit", "delivered"]
+        assert events[ids[1]].location == {"city": "Austin", "state": "TX"}
+        assert events[ids[2]].occurred_at == datetime(2026, 1, 2, 15, 30)
+
 
 class TestConversationRepository:
     """Tests for ConversationRepository."""
@@ -430,6 +573,43 @@ class TestShipmentOrderIntegration:
         found_shipment = shipment_repo.get_by_order_id(sample_order.id)
         assert found_shipment.id == shipment.id
 
+    def test_order_lists_load_shipments_only_on_request(self, order_repo, shipment_repo, sample_customer, sample_order):
+        """Test that order lists eager-load shipments and forbid lazy loads when asked."""
+        from sqlalchemy.exc import InvalidRequestError
+
+        shipment = shipment_repo.create({
+            "customer_id": sample_customer.id,
+            "order_id": sample_order.id,
+            "carrier": "USPS",
+            "service": "Priority",
+            "tracking_number": "9400111899223385748672",
+        })
+
+        [order] = order_repo.list_by_customer(sample_customer.id, with_shipment=True)
+        assert order.shipment.id == shipment.id
+
+        order_repo.db.expire_all()
+        [order] = order_repo.list_unfulfilled(sample_customer.id, no_lazy_loads=True)
+        with pytest.raises(InvalidRequestError):
+            order.shipment
+
+    def test_order_lists_allow_lazy_loads_by_default(self, order_repo, shipment_repo, sample_customer, sample_order):
+        """Test that a plain list leaves later lookups in the same session free to lazy load."""
+        shipment = shipment_repo.create({
+            "customer_id": sample_customer.id,
+            "order_id": sample_order.id,
+            "carrier": "USPS",
+            "service": "Priority",
+            "tracking_number": "9400111899223385748672",
+        })
+        order_repo.db.expire_all()
+
+        order_repo.list_unfulfilled(sample_customer.id)
+        order = order_repo.get_by_id(sample_order.id)
+
+        assert order.customer.id == sample_customer.id
+        assert order.shipment.id == shipment.id
+
     def test_shipment_increments_label_count(self, customer_repo, shipment_repo, sample_customer):
         """Test that creating a shipment increments label count."""
         initial_count = sample_customer.labels_this_month
@@ -448,3 +628,83 @@ class TestShipmentOrderIntegration:
         # Verify
         customer = customer_repo.get_by_id(sample_customer.id)
         assert customer.labels_this_month == initial_count + 1
+
+
+class TestDatabaseEngine:
+    """Tests for engine configuration."""
+
+    def test_sqlite_file_uses_wal(self, tmp_path):
+        """Test that file-backed SQLite connections get WAL and tuned pragmas."""
+        from sqlalchemy import text
+        from src.db.database import create_db_engine
+
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'wal.db'}")
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        engine.dispose()
+
+    def test_sqlite_memory_skips_wal(self):
+        """Test that in-memory SQLite keeps its memory journal."""
+        from sqlalchemy import text
+        from src.db.database import create_db_engine
+
+        engine = create_db_engine("sqlite:///:memory:")
+        with engine.connect() as conn:
+            assert conn.execute(text("PRAGMA journal_mode")).scalar() == "memory"
+        engine.dispose()
+
+    def test_json_columns_round_trip(self):
+        """Test that JSON columns survive the engine's serializer unchanged."""
+        from src.db.database import create_db_engine
+
+        engine = create_db_engine("sqlite:///:memory:")
+        Base.metadata.create_all(bind=engine)
+        messages = [{"role": "user", "content": "héllo", "meta": {"n": 1.5, "ok": True, "x": None}}]
+        customer_id = uuid.uuid4()
+        with Session(engine) as session:
+            session.add(Customer(id=customer_id, shop_domain="json.myshopify.com", email="json@example.com", name="Json"))
+            session.add(Conversation(customer_id=customer_id, messages=messages))
+            session.commit()
+        with Session(engine) as session:
+            assert session.query(Conversation).one().messages == messages
+        engine.dispose()
+
+    def test_postgres_url_prefers_psycopg(self, monkeypatch):
+        """Test that bare PostgreSQL URLs use psycopg 3 only when it is importable."""
+        import sys
+        import types
+        from src.db.database import normalize_database_url
+
+        url = "postgresql://user:pw@localhost/shipping"
+        monkeypatch.setitem(sys.modules, "psycopg", None)
+        assert normalize_database_url(url) == url
+
+        monkeypatch.setitem(sys.modules, "psycopg", types.ModuleType("psycopg"))
+        assert normalize_database_url(url) == "postgresql+psycopg://user:pw@localhost/shipping"
+        assert normalize_database_url("postgres://h/db") == "postgresql+psycopg://h/db"
+        assert normalize_database_url("sqlite:///./x.db") == "sqlite:///./x.db"
+
+
+class TestMigrations:
+    """Tests for migration helpers."""
+
+    def test_needs_migration_compares_against_head(self, tmp_path, monkeypatch):
+        """Test that only a database stamped at head skips migration."""
+        from sqlalchemy import text
+        from src.db.migrations import get_head_revision, needs_migration
+
+        url = f"sqlite:///{tmp_path / 'migrations.db'}"
+        monkeypatch.setenv("DATABASE_URL", url)
+        assert needs_migration()
+
+        engine = create_engine(url)
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)"))
+            conn.execute(
+                text("INSERT INTO alembic_version VALUES (:rev)"),
+                {"rev": get_head_revision()},
+            )
+        engine.dispose()
+        assert not needs_migration()
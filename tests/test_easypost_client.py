@@ -0,0 +1,390 @@
+"""Tests for the EasyPost API client wrapper."""
+
+import json
+import logging
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import easypost
+import easypost.requestor
+import pytest
+
+from src.easypost_async import AsyncEasyPostClient
+from src.easypost_client import Address, EasyPostClient, Parcel, RateError, TrackingError, _EasyPostRetry
+from src.mock import MockEasyPostClient
+
+
+@pytest.fixture
+def client():
+    return EasyPostClient(api_key="EZTK_test_key")
+
+
+@pytest.fixture
+def to_address():
+    return Address(name="Jane", street1="1 Main St", city="Chicago", state="IL", zip_code="60601")
+
+
+@pytest.fixture
+def parcel():
+    return Parcel(length=10, width=8, height=4, weight=32)
+
+
+def _sdk_rate(rate_id: str, rate: str) -> SimpleNamespace:
+    return SimpleNamespace(id=rate_id, carrier="USPS", service="Priority", rate=rate, delivery_days=2)
+
+
+def _sdk_bought(shipment_id: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=shipment_id,
+        tracking_code="9400100000000000000000",
+        postage_label=SimpleNamespace(label_url="https://example.com/label.pdf"),
+        selected_rate=SimpleNamespace(carrier="USPS", service="Priority", rate="7.50"),
+    )
+
+
+def _raise(error: Exception):
+    raise error
+
+
+class TestModels:
+    """Tests for the value types."""
+
+    def test_models_are_immutable_and_hashable(self, to_address, parcel):
+        with pytest.raises(AttributeError):
+            to_address.city = "Elsewhere"
+        assert not hasattr(parcel, "__dict__")
+        assert {to_address: 1}[Address(**{f: getattr(to_address, f) for f in Address.__slots__})] == 1
+
+    def test_address_api_dict_uses_easypost_field_names(self, to_address):
+        payload = to_address.to_api_dict()
+        assert payload["zip"] == "60601"
+        assert "zip_code" not in payload
+        assert payload["country"] == "US"
+
+
+class TestResponseParsing:
+    """Tests for SDK response parsing."""
+
+    def test_sdk_parses_responses_and_rejects_malformed_bodies(self, client):
+        requestor = easypost.requestor.Requestor(client.client)
+
+        assert requestor.interpret_response('{"id": "shp_1", "rates": []}', 200) == {"id": "shp_1", "rates": []}
+        with pytest.raises(easypost.errors.JsonError):
+            requestor.interpret_response("<html>", 502)
+
+    def test_stdlib_json_is_untouched(self):
+        assert json.loads.__module__ == "json"
+
+    def test_sdk_uses_orjson_when_installed(self):
+        orjson = pytest.importorskip("orjson")
+        assert easypost.requestor.json.loads is orjson.loads
+
+
+class TestHttpSession:
+    """Tests for the shared HTTP session."""
+
+    def test_clients_share_session(self, client):
+        other = EasyPostClient(api_key="EZTK_other_key")
+        assert client.client._requests_session is EasyPostClient.session
+        assert other.client._requests_session is EasyPostClient.session
+
+    def test_session_pools_connections(self):
+        adapter = EasyPostClient.session.get_adapter("https://api.easypost.com/v2")
+        assert adapter._pool_maxsize == 50
+        assert isinstance(adapter.max_retries, _EasyPostRetry)
+
+    def test_rate_limited_post_is_retried(self):
+        retry = _EasyPostRetry(total=3, status_forcelist=(429, 500))
+        assert retry.is_retry("POST", 429)
+
+    def test_failed_post_is_not_retried(self):
+        retry = _EasyPostRetry(total=3, status_forcelist=(429, 500))
+        assert not retry.is_retry("POST", 500)
+        assert retry.is_retry("GET", 500)
+
+
+class TestCreateShipment:
+    """Tests for buying on the quoting shipment."""
+
+    @pytest.fixture
+    def sdk(self, client):
+        client.client = MagicMock()
+        return client.client
+
+    def test_quoted_rate_buys_without_new_shipment(self, client, sdk, to_address, parcel):
+        sdk.shipment.create.return_value = SimpleNamespace(
+            id="shp_quote", rates=[_sdk_rate("rate_b", "9.00"), _sdk_rate("rate_a", "7.50")]
+        )
+        sdk.shipment.buy.return_value = _sdk_bought("shp_quote")
+
+        rates = client.get_rates(to_address, parcel)
+        assert [r.rate_id for r in rates] == ["rate_a", "rate_b"]
+        assert rates[0].shipment_id == "shp_quote"
+
+        shipment = client.create_shipment(to_address, parcel, "rate_a")
+
+        assert shipment.id == "shp_quote"
+        sdk.shipment.create.assert_called_once()
+        sdk.shipment.buy.assert_called_once_with("shp_quote", rate={"id": "rate_a"})
+        # Sibling rates of a bought shipment are no longer usable
+        assert client._quoted_shipment_id("rate_b", client._quote_fingerprint(to_address, parcel, None)) is None
+
+    def test_quoted_rate_for_other_address_creates_shipment(self, client, sdk, to_address, parcel):
+        sdk.shipment.create.side_effect = [
+            SimpleNamespace(id="shp_quote", rates=[_sdk_rate("rate_a", "7.50")]),
+            SimpleNamespace(id="shp_new", rates=[]),
+        ]
+        sdk.shipment.buy.return_value = _sdk_bought("shp_new")
+        other = Address(name="Bo", street1="2 Elm St", city="Austin", state="TX", zip_code="78701")
+
+        client.get_rates(to_address, parcel)
+        client.create_shipment(other, parcel, "rate_a")
+
+        assert sdk.shipment.create.call_count == 2
+        assert sdk.shipment.create.call_args.kwargs["to_address"]["street1"] == "2 Elm St"
+        sdk.shipment.buy.assert_called_once_with("shp_new", rate={"id": "rate_a"})
+
+    def test_cheapest_rates_compare_numerically(self, client, sdk, to_address, parcel):
+        sdk.shipment.create.return_value = SimpleNamespace(
+            id="shp_quote",
+            rates=[_sdk_rate("rate_a", "10.50"), _sdk_rate("rate_b", "9.00"), _sdk_rate("rate_c", "12.25")],
+        )
+
+        rates = client.get_cheapest_rates(to_address, parcel, k=2)
+
+        assert [r.rate_id for r in rates] == ["rate_b", "rate_a"]
+        fingerprint = client._quote_fingerprint(to_address, parcel, None)
+        assert client._quoted_shipment_id("rate_a", fingerprint) == "shp_quote"
+
+    def test_default_from_address_is_serialized_once(self, client, sdk, to_address, parcel):
+        sdk.shipment.create.return_value = SimpleNamespace(id="shp_quote", rates=[])
+
+        client.get_rates(to_address, parcel)
+        client.get_rates(to_address, parcel)
+
+        first, second = (c.kwargs["from_address"] for c in sdk.shipment.create.call_args_list)
+        assert first is second
+        assert first["name"] == client.from_address.name
+
+    def test_unknown_rate_creates_shipment(self, client, sdk, to_address, parcel):
+        sdk.shipment.create.return_value = SimpleNamespace(id="shp_new", rates=[])
+        sdk.shipment.buy.return_value = _sdk_bought("shp_new")
+
+        client.create_shipment(to_address, parcel, "rate_unseen")
+
+        sdk.shipment.create.assert_called_once()
+        sdk.shipment.buy.assert_called_once_with("shp_new", rate={"id": "rate_unseen"})
+
+
+class TestValidateAddress:
+    """Tests for the verified-address cache."""
+
+    @pytest.fixture
+    def sdk(self, client):
+        EasyPostClient._address_cache.clear()
+        EasyPostClient._address_ids.clear()
+        client.client = MagicMock()
+        yield client.client
+        EasyPostClient._address_cache.clear()
+        EasyPostClient._address_ids.clear()
+
+    def test_verified_address_is_cached(self, client, sdk, to_address):
+        sdk.address.create_and_verify.return_value = SimpleNamespace(
+            id="adr_123", name="JANE", street1="1 MAIN ST", street2=None, city="CHICAGO",
+            state="IL", zip="60601-1234", country="US", phone=None,
+        )
+        respelled = Address(name="jane ", street1="1 main st", city="chicago", state="il", zip_code="60601-0000")
+
+        first = client.validate_address(to_address)
+        second = client.validate_address(respelled)
+
+        assert first == second
+        assert first[1].zip_code == "60601-1234"
+        sdk.address.create_and_verify.assert_called_once()
+
+    def test_rates_reference_verified_address(self, client, sdk, to_address, parcel):
+        sdk.address.create_and_verify.return_value = SimpleNamespace(
+            id="adr_123", name="JANE", street1="1 MAIN ST", street2=None, city="CHICAGO",
+            state="IL", zip="60601-1234", country="US", phone=None,
+        )
+        sdk.shipment.create.return_value = SimpleNamespace(id="shp_quote", rates=[])
+        other = Address(name="Bo", street1="2 Elm St", city="Austin", state="TX", zip_code="78701")
+
+        _, corrected, _ = client.validate_address(to_address)
+        client.get_rates(corrected, parcel)
+        client.get_rates(other, parcel)
+
+        sent = [c.kwargs["to_address"] for c in sdk.shipment.create.call_args_list]
+        assert sent[0] == {"id": "adr_123"}
+        assert sent[1]["street1"] == "2 Elm St"
+
+    def test_invalid_address_is_not_cached(self, client, sdk, to_address):
+        sdk.address.create_and_verify.side_effect = easypost.errors.ApiError("E.ADDRESS.NOT_FOUND")
+
+        assert client.validate_address(to_address)[0] is False
+        assert client.validate_address(to_address)[0] is False
+        assert sdk.address.create_and_verify.call_count == 2
+
+
+class TestGetTracking:
+    """Tests for tracking responses."""
+
+    @pytest.fixture
+    def sdk(self, client):
+        EasyPostClient._tracking_cache.clear()
+        client.client = MagicMock()
+        yield client.client
+        EasyPostClient._tracking_cache.clear()
+
+    def test_events_format_location(self, client, sdk):
+        sdk.tracker.create.return_value = SimpleNamespace(
+            status="in_transit",
+            est_delivery_date=None,
+            tracking_details=[
+                SimpleNamespace(status="in_transit", message="Departed", datetime="t2",
+                                tracking_location=SimpleNamespace(city="Chicago", state="IL")),
+                SimpleNamespace(status="pre_transit", message="Label created", datetime="t1",
+                                tracking_location=None),
+            ],
+        )
+
+        info = client.get_tracking("9400100000000000000000", "USPS")
+
+        assert [e["location"] for e in info["events"]] == ["Chicago, IL", None]
+
+    def test_tracking_is_cached_until_invalidated(self, client, sdk):
+        sdk.tracker.create.return_value = SimpleNamespace(
+            status="delivered", est_delivery_date=None, tracking_details=[]
+        )
+
+        client.get_tracking("1Z999", "ups")
+        client.get_tracking("1Z999", "UPS")
+        assert sdk.tracker.create.call_count == 1
+
+        client.invalidate_tracking("1Z999", "UPS")
+        client.get_tracking("1Z999", "UPS")
+        assert sdk.tracker.create.call_count == 2
+
+    def test_tracking_cache_is_per_api_key(self, client, sdk):
+        sdk.tracker.create.return_value = SimpleNamespace(
+            status="delivered", est_delivery_date=None, tracking_details=[]
+        )
+
+        sdk.api_key = "key_a"
+        client.get_tracking("1Z999", "UPS")
+        sdk.api_key = "key_b"
+        client.get_tracking("1Z999", "UPS")
+
+        assert sdk.tracker.create.call_count == 2
+
+    def test_cached_tracking_is_not_shared(self, client, sdk):
+        sdk.tracker.create.return_value = SimpleNamespace(
+            status="in_transit",
+            est_delivery_date=None,
+            tracking_details=[
+                SimpleNamespace(status="in_transit", message="Departed", datetime="t1",
+                                tracking_location=None),
+            ],
+        )
+
+        first = client.get_tracking("1Z999", "UPS")
+        first["status"] = "delivered"
+        first["events"][0]["message"] = "changed"
+
+        second = client.get_tracking("1Z999", "UPS")
+        assert second["status"] == "in_transit"
+        assert second["events"][0]["message"] == "Departed"
+        assert sdk.tracker.create.call_count == 1
+
+    @pytest.mark.parametrize("error_text,expected", [
+        ("Tracking code NOT FOUND", "Tracking number not found"),
+        ("Invalid tracking_code", "Tracking number not found"),
+        ("Service unavailable", "Unable to fetch tracking"),
+    ])
+    def test_api_errors_are_classified(self, client, sdk, error_text, expected):
+        sdk.tracker.create.side_effect = easypost.errors.ApiError(error_text)
+
+        with pytest.raises(TrackingError) as exc_info:
+            client.get_tracking("1Z999", "UPS")
+        assert exc_info.value.message.startswith(expected)
+
+
+class TestUnexpectedErrors:
+    """Tests for logging of non-API failures."""
+
+    def test_traceback_only_logged_at_debug(self, client, to_address, parcel, caplog, monkeypatch):
+        # Alembic's fileConfig disables existing loggers when migrations run earlier in the session
+        monkeypatch.setattr(logging.getLogger("src.easypost_client"), "disabled", False)
+        client.client = MagicMock()
+        client.client.shipment.create.side_effect = ConnectionError("reset")
+
+        with caplog.at_level(logging.INFO, logger="src.easypost_client"):
+            with pytest.raises(RateError) as exc_info:
+                client.get_rates(to_address, parcel)
+        assert exc_info.value.original_error is client.client.shipment.create.side_effect
+        assert "ConnectionError: reset" in caplog.records[-1].getMessage()
+        assert caplog.records[-1].exc_info is None
+
+        with caplog.at_level(logging.DEBUG, logger="src.easypost_client"):
+            with pytest.raises(RateError):
+                client.get_rates(to_address, parcel)
+        assert caplog.records[-1].exc_info is not None
+
+
+class TestBatchCalls:
+    """Tests for the thread-pool batch methods."""
+
+    def test_get_rates_many_keeps_order_and_errors(self, client, to_address, parcel):
+        client.client = MagicMock()
+        error = ConnectionError("reset")
+        client.client.shipment.create.side_effect = lambda **kw: (
+            SimpleNamespace(id="shp_west", rates=[_sdk_rate("rate_w", "9.00")])
+            if kw["to_address"]["state"] == "CA" else _raise(error)
+        )
+        west = Address(name="Al", street1="1 Sunset Blvd", city="Los Angeles", state="CA", zip_code="90001")
+
+        results = client.get_rates_many([(west, parcel), (to_address, parcel)])
+
+        assert [r.rate_id for r in results[0]] == ["rate_w"]
+        assert isinstance(results[1], RateError)
+        assert results[1].original_error is error
+
+    @pytest.mark.asyncio
+    async def test_async_client_shares_the_rate_limiter(self, monkeypatch):
+        import src.easypost_client as easypost_client
+
+        waits = []
+        monkeypatch.setattr(easypost_client._batch_spacer, "wait", lambda: waits.append(1))
+        sync_client = MagicMock()
+        sync_client.get_tracking.return_value = {"status": "delivered"}
+
+        await AsyncEasyPostClient(sync_client).get_tracking_many([("1Z1", "UPS"), ("1Z2", "UPS")])
+        await AsyncEasyPostClient(sync_client).get_tracking("1Z3", "UPS")
+
+        assert len(waits) == 3
+
+
+class TestAsyncClient:
+    """Tests for the async fan-out client."""
+
+    @pytest.mark.asyncio
+    async def test_get_rates_many_keeps_order(self, to_address, parcel):
+        client = AsyncEasyPostClient(MockEasyPostClient())
+        west = Address(name="Al", street1="1 Sunset Blvd", city="Los Angeles", state="CA", zip_code="90001")
+
+        results = await client.get_rates_many([(to_address, parcel), (west, parcel)])
+
+        assert len(results) == 2
+        # West coast destinations price higher in the mock
+        assert results[1][0].rate > results[0][0].rate
+
+    @pytest.mark.asyncio
+    async def test_get_tracking_many_returns_errors_in_place(self):
+        sync_client = MagicMock()
+        error = TrackingError(message="Tracking number not found.", code="EASYPOST_TRACKING_ERROR")
+        sync_client.get_tracking.side_effect = [{"status": "delivered"}, error]
+        client = AsyncEasyPostClient(sync_client)
+
+        results = await client.get_tracking_many([("1Z1", "UPS"), ("bad", "USPS")])
+
+        assert results == [{"status": "delivered"}, error]
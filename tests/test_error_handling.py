@@ -13,6 +13,15 @@ os.environ["SHOPIFY_API_SECRET"] = "test-api-secret"
 os.environ["DATABASE_URL"] = "sqlite:///./test_error_handling.db"
 
 
+@pytest.fixture(scope="module", autouse=True)
+def remove_test_database():
+    """Remove the database the app's startup migrations create for TestClient(app) tests."""
+    yield
+    import pathlib
+    for suffix in ("", "-wal", "-shm"):
+        pathlib.Path(f"test_error_handling.db{suffix}").unlink(missing_ok=True)
+
+
 class TestErrorResponseFormat:
     """Tests for consistent error response format."""
 
@@ -31,9 +40,12 @@ class TestErrorResponseFormat:
         yield engine
         Base.metadata.drop_all(bind=engine)
         engine.dispose()
+        from src.db.database import engine as app_engine
+        app_engine.dispose()
 
         import pathlib
-        pathlib.Path("test_error_handling.db").unlink(missing_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            pathlib.Path(f"test_error_handling.db{suffix}").unlink(missing_ok=True)
 
     @pytest.fixture
     def test_client(self, setup_database):
@@ -142,9 +154,12 @@ class TestEasyPostErrorHandling:
         yield engine
         Base.metadata.drop_all(bind=engine)
         engine.dispose()
+        from src.db.database import engine as app_engine
+        app_engine.dispose()
 
         import pathlib
-        pathlib.Path("test_error_handling.db").unlink(missing_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            pathlib.Path(f"test_error_handling.db{suffix}").unlink(missing_ok=True)
 
     @pytest.fixture
     def test_client(self, setup_database):
@@ -365,9 +380,12 @@ class TestChatErrorHandling:
         yield engine
         Base.metadata.drop_all(bind=engine)
         engine.dispose()
+        from src.db.database import engine as app_engine
+        app_engine.dispose()
 
         import pathlib
-        pathlib.Path("test_error_handling.db").unlink(missing_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            pathlib.Path(f"test_error_handling.db{suffix}").unlink(missing_ok=True)
 
     @pytest.fixture
     def test_client(self, setup_database):
@@ -471,9 +489,12 @@ class TestMalformedRequestHandling:
         yield engine
         Base.metadata.drop_all(bind=engine)
         engine.dispose()
+        from src.db.database import engine as app_engine
+        app_engine.dispose()
 
         import pathlib
-        pathlib.Path("test_error_handling.db").unlink(missing_ok=True)
+        for suffix in ("", "-wal", "-shm"):
+            pathlib.Path(f"test_error_handling.db{suffix}").unlink(missing_ok=True)
 
     @pytest.fixture
     def test_client(self, setup_database):
@@ -528,9 +549,10 @@ class TestMalformedRequestHandling:
             "/api/orders/not-a-uuid",
             headers={"X-Customer-ID": customer_with_db},
         )
-        assert response.status_code == 400
+        # Same validation error as the shipping endpoints' UUID path params
+        assert response.status_code == 422
         data = response.json()
-        assert "Invalid order ID format" in data["detail"]
+        assert data["detail"][0]["loc"] == ["path", "order_id"]
 
     def test_missing_required_fields(self, test_client, customer_with_db):
         """Test missing required fields returns validation error."""
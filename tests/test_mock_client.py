@@ -2,7 +2,7 @@
 
 import pytest
 
-from src.mock import MockEasyPostClient, _generate_tracking
+from src.mock import MOCK_RESPONSES, MockEasyPostClient, _generate_tracking, get_mock_response
 from src.easypost_client import Address, Parcel
 
 
@@ -108,6 +108,16 @@ class TestGetRates:
         assert "UPS" in carriers
         assert "FedEx" in carriers
 
+    def test_cheapest_rates_are_a_prefix(self, sample_address, sample_parcel):
+        all_rates = MockEasyPostClient(seed=3).get_rates(sample_address, sample_parcel)
+        cheapest = MockEasyPostClient(seed=3).get_cheapest_rates(sample_address, sample_parcel, k=2)
+        assert cheapest == all_rates[:2]
+
+    def test_seeded_clients_are_reproducible(self, sample_address, sample_parcel):
+        first = MockEasyPostClient(seed=7).get_rates(sample_address, sample_parcel)
+        second = MockEasyPostClient(seed=7).get_rates(sample_address, sample_parcel)
+        assert [r.rate_id for r in first] == [r.rate_id for r in second]
+
 
 class TestValidateAddress:
     """Tests for MockEasyPostClient.validate_address."""
@@ -243,3 +253,19 @@ class TestGetTracking:
             assert "status" in event
             assert "message" in event
             assert "datetime" in event
+
+
+class TestGetMockResponse:
+    """Tests for get_mock_response keyword routing."""
+
+    @pytest.mark.parametrize("message,category", [
+        ("How much to ship to Denver?", "rates"),
+        ("Please VERIFY this address", "validate"),
+        ("Ship it with the cheapest option", "ship"),
+        ("Hello there", "default"),
+    ])
+    def test_routes_by_keyword(self, message, category):
+        assert get_mock_response(message) == MOCK_RESPONSES[category]
+
+    def test_rates_keywords_take_priority(self):
+        assert get_mock_response("Verify the price, then buy") == MOCK_RESPONSES["rates"]
@@ -131,7 +131,6 @@ class TestShopifyOrderWebhook:
                 MockCustomerRepo.return_value = mock_customer_repo
 
                 mock_order_repo = MagicMock()
-                mock_order_repo.get_by_shopify_id.return_value = None  # Order doesn't exist
                 MockOrderRepo.return_value = mock_order_repo
 
                 response = client.post(
@@ -146,7 +145,9 @@ class TestShopifyOrderWebhook:
 
                 assert response.status_code == 200
                 assert response.json()["status"] == "ok"
-                mock_order_repo.create.assert_called_once()
+                mock_order_repo.upsert_by_shopify_id.assert_called_once()
+                order_data = mock_order_repo.upsert_by_shopify_id.call_args.args[0]
+                assert order_data["shopify_order_id"] == str(SAMPLE_ORDER_PAYLOAD["id"])
 
     @patch("src.api.deps.get_db")
     @patch("src.api.webhooks.verify_webhook_hmac")
@@ -184,7 +185,8 @@ class TestShopifyOrderWebhook:
                 )
 
                 assert response.status_code == 200
-                # Should not create new order
+                # Updates go through the same single-statement upsert
+                mock_order_repo.upsert_by_shopify_id.assert_called_once()
                 mock_order_repo.create.assert_not_called()
 
     @patch("src.api.deps.get_db")
@@ -338,14 +340,14 @@ class TestShopifyAdminClient:
             "orders": [SAMPLE_ORDER_PAYLOAD]
         }
 
-        with patch("httpx.AsyncClient") as MockClient:
+        with patch("src.auth.shopify.get_http_client") as get_client:
             mock_instance = AsyncMock()
             mock_instance.get.return_value = MagicMock(
                 status_code=200,
-                json=lambda: mock_response,
+                content=json.dumps(mock_response).encode(),
                 raise_for_status=lambda: None,
             )
-            MockClient.return_value.__aenter__.return_value = mock_instance
+            get_client.return_value = mock_instance
 
             orders = await client.get_orders()
 
@@ -354,6 +356,39 @@ class TestShopifyAdminClient:
             assert orders[0].id == str(SAMPLE_ORDER_PAYLOAD["id"])
             assert orders[0].order_number == SAMPLE_ORDER_PAYLOAD["order_number"]
 
+    @pytest.mark.asyncio
+    async def test_iter_orders_follows_link_header(self):
+        """iter_orders should follow rel="next" links until the last page."""
+        import httpx
+        from src.auth.shopify import ShopifyAdminClient
+
+        client = ShopifyAdminClient("test.myshopify.com", "test-token")
+        next_url = f"{client.base_url}/orders.json?limit=250&page_info=abc"
+        request = httpx.Request("GET", client.base_url)
+
+        first_page = httpx.Response(
+            200,
+            headers={"Link": f'<{next_url}>; rel="next"'},
+            content=json.dumps({"orders": [SAMPLE_ORDER_PAYLOAD]}).encode(),
+            request=request,
+        )
+        second_page = httpx.Response(
+            200,
+            content=json.dumps({"orders": [{**SAMPLE_ORDER_PAYLOAD, "id": 42}]}).encode(),
+            request=request,
+        )
+
+        with patch("src.auth.shopify.get_http_client") as get_client:
+            mock_instance = AsyncMock()
+            mock_instance.get.side_effect = [first_page, second_page]
+            get_client.return_value = mock_instance
+
+            orders = [order async for order in client.iter_orders(status="any")]
+
+            assert [o.id for o in orders] == [str(SAMPLE_ORDER_PAYLOAD["id"]), "42"]
+            assert mock_instance.get.call_count == 2
+            assert mock_instance.get.call_args_list[1].args[0] == next_url
+
     @pytest.mark.asyncio
     async def test_get_order_returns_single_order(self):
         """get_order should return a single ShopifyOrder."""
@@ -363,14 +398,14 @@ class TestShopifyAdminClient:
 
         mock_response = {"order": SAMPLE_ORDER_PAYLOAD}
 
-        with patch("httpx.AsyncClient") as MockClient:
+        with patch("src.auth.shopify.get_http_client") as get_client:
             mock_instance = AsyncMock()
             mock_instance.get.return_value = MagicMock(
                 status_code=200,
-                json=lambda: mock_response,
+                content=json.dumps(mock_response).encode(),
                 raise_for_status=lambda: None,
             )
-            MockClient.return_value.__aenter__.return_value = mock_instance
+            get_client.return_value = mock_instance
 
             order = await client.get_order("5678901234")
 
@@ -384,10 +419,10 @@ class TestShopifyAdminClient:
 
         client = ShopifyAdminClient("test.myshopify.com", "test-token")
 
-        with patch("httpx.AsyncClient") as MockClient:
+        with patch("src.auth.shopify.get_http_client") as get_client:
             mock_instance = AsyncMock()
             mock_instance.get.return_value = MagicMock(status_code=404)
-            MockClient.return_value.__aenter__.return_value = mock_instance
+            get_client.return_value = mock_instance
 
             order = await client.get_order("nonexistent")
 
@@ -422,22 +457,22 @@ class TestShopifyAdminClient:
             }
         }
 
-        with patch("httpx.AsyncClient") as MockClient:
+        with patch("src.auth.shopify.get_http_client") as get_client:
             mock_instance = AsyncMock()
 
             # First call: get fulfillment orders
             # Second call: create fulfillment
             mock_instance.get.return_value = MagicMock(
                 status_code=200,
-                json=lambda: fulfillment_orders_response,
+                content=json.dumps(fulfillment_orders_response).encode(),
                 raise_for_status=lambda: None,
             )
             mock_instance.post.return_value = MagicMock(
                 status_code=200,
-                json=lambda: fulfillment_response,
+                content=json.dumps(fulfillment_response).encode(),
                 raise_for_status=lambda: None,
             )
-            MockClient.return_value.__aenter__.return_value = mock_instance
+            get_client.return_value = mock_instance
 
             result = await client.create_fulfillment(
                 order_id="5678901234",
@@ -463,19 +498,65 @@ class TestShopifyAdminClient:
             }
         }
 
-        with patch("httpx.AsyncClient") as MockClient:
+        with patch("src.auth.shopify.get_http_client") as get_client:
             mock_instance = AsyncMock()
             mock_instance.post.return_value = MagicMock(
                 status_code=201,
-                json=lambda: webhook_response,
+                content=json.dumps(webhook_response).encode(),
             )
-            MockClient.return_value.__aenter__.return_value = mock_instance
+            get_client.return_value = mock_instance
 
             result = await client.register_webhooks("https://myapp.com")
 
             # Should attempt to register 3 webhooks
             assert mock_instance.post.call_count == 3
 
+    @pytest.mark.asyncio
+    async def test_register_webhooks_tolerates_failed_topic(self):
+        """A failed registration should not drop the others."""
+        import httpx
+        from src.auth.shopify import ShopifyAdminClient
+
+        client = ShopifyAdminClient("test.myshopify.com", "test-token")
+
+        ok = MagicMock(status_code=201, content=json.dumps({"webhook": {"id": 1}}).encode())
+        exists = MagicMock(status_code=422)
+
+        with patch("src.auth.shopify.get_http_client") as get_client:
+            mock_instance = AsyncMock()
+            mock_instance.post.side_effect = [ok, httpx.ConnectError("boom"), exists]
+            get_client.return_value = mock_instance
+
+            result = await client.register_webhooks("https://myapp.com")
+
+            assert result == [{"id": 1}]
+            assert mock_instance.post.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_http_client_is_shared(self):
+        """Calls should reuse one pooled HTTP client until it is closed."""
+        from src.auth.shopify import close_http_client, get_http_client
+
+        client = get_http_client()
+        assert get_http_client() is client
+
+        await close_http_client()
+        assert client.is_closed
+        assert get_http_client() is not client
+        await close_http_client()
+
+    def test_http_client_is_per_event_loop(self):
+        """Each event loop should get its own client."""
+        import asyncio
+        from src.auth.shopify import close_http_client, get_http_client
+
+        async def get_and_close():
+            client = get_http_client()
+            await close_http_client()
+            return client
+
+        assert asyncio.run(get_and_close()) is not asyncio.run(get_and_close())
+
 
 class TestOrderSyncEndpoint:
     """Tests for /api/orders/sync endpoint."""
@@ -498,11 +579,6 @@ class TestFulfillmentWriteback:
         """_create_shopify_fulfillment should create fulfillment in Shopify."""
         from src.api.shipping import _create_shopify_fulfillment
 
-        mock_customer = MagicMock()
-        mock_customer.id = "customer-123"
-        mock_customer.shop_domain = "test-store.myshopify.com"
-        mock_customer.shopify_access_token = "encrypted-token"
-
         with patch("src.api.shipping.decrypt_token") as mock_decrypt:
             mock_decrypt.return_value = "decrypted-token"
 
@@ -514,7 +590,9 @@ class TestFulfillmentWriteback:
                 MockClient.return_value = mock_instance
 
                 result = await _create_shopify_fulfillment(
-                    customer=mock_customer,
+                    customer_id="customer-123",
+                    shop_domain="test-store.myshopify.com",
+                    encrypted_access_token="encrypted-token",
                     shopify_order_id="5678901234",
                     tracking_number="9400111899223033005115",
                     carrier="USPS",
@@ -533,12 +611,10 @@ class TestFulfillmentWriteback:
         """_create_shopify_fulfillment should skip if no token."""
         from src.api.shipping import _create_shopify_fulfillment
 
-        mock_customer = MagicMock()
-        mock_customer.id = "customer-123"
-        mock_customer.shopify_access_token = None
-
         result = await _create_shopify_fulfillment(
-            customer=mock_customer,
+            customer_id="customer-123",
+            shop_domain="test-store.myshopify.com",
+            encrypted_access_token=None,
             shopify_order_id="5678901234",
             tracking_number="9400111899223033005115",
             carrier="USPS",
@@ -551,11 +627,6 @@ class TestFulfillmentWriteback:
         """_create_shopify_fulfillment should handle API errors gracefully."""
         from src.api.shipping import _create_shopify_fulfillment
 
-        mock_customer = MagicMock()
-        mock_customer.id = "customer-123"
-        mock_customer.shop_domain = "test-store.myshopify.com"
-        mock_customer.shopify_access_token = "encrypted-token"
-
         with patch("src.api.shipping.decrypt_token") as mock_decrypt:
             mock_decrypt.return_value = "decrypted-token"
 
@@ -567,7 +638,9 @@ class TestFulfillmentWriteback:
                 MockClient.return_value = mock_instance
 
                 result = await _create_shopify_fulfillment(
-                    customer=mock_customer,
+                    customer_id="customer-123",
+                    shop_domain="test-store.myshopify.com",
+                    encrypted_access_token="encrypted-token",
                     shopify_order_id="5678901234",
                     tracking_number="9400111899223033005115",
                     carrier="USPS",
@@ -581,11 +654,6 @@ class TestFulfillmentWriteback:
         """_create_shopify_fulfillment should map carrier names correctly."""
         from src.api.shipping import _create_shopify_fulfillment
 
-        mock_customer = MagicMock()
-        mock_customer.id = "customer-123"
-        mock_customer.shop_domain = "test-store.myshopify.com"
-        mock_customer.shopify_access_token = "encrypted-token"
-
         with patch("src.api.shipping.decrypt_token") as mock_decrypt:
             mock_decrypt.return_value = "decrypted-token"
 
@@ -598,7 +666,9 @@ class TestFulfillmentWriteback:
 
                 # Test DHL mapping
                 await _create_shopify_fulfillment(
-                    customer=mock_customer,
+                    customer_id="customer-123",
+                    shop_domain="test-store.myshopify.com",
+                    encrypted_access_token="encrypted-token",
                     shopify_order_id="5678901234",
                     tracking_number="123456",
                     carrier="DHL",
@@ -1,5 +1,7 @@
 """Tests for Pydantic schema validation."""
 
+from uuid import UUID
+
 import pytest
 from pydantic import ValidationError
 
@@ -287,8 +289,13 @@ class TestRateRequestValidation:
 
     def test_valid_with_order_id(self):
         """Rate request with order_id should pass."""
-        req = RateRequest(order_id="order-123")
-        assert req.order_id == "order-123"
+        req = RateRequest(order_id="0b7e6f4c-3a51-4d2a-9f0e-2d1c5b8a7e61")
+        assert req.order_id == UUID("0b7e6f4c-3a51-4d2a-9f0e-2d1c5b8a7e61")
+
+    def test_malformed_order_id_rejected(self):
+        """Rate request with a non-UUID order_id should fail validation."""
+        with pytest.raises(ValidationError):
+            RateRequest(order_id="order-123")
 
     def test_valid_with_address_fields(self):
         """Rate request with address fields should pass."""